@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -123,6 +124,9 @@ CORS_ALLOWED_ORIGINS = [
 
 # Allow credentials for CORS
 CORS_ALLOW_CREDENTIALS = True
+# 断点续传用到的请求头/响应头
+CORS_ALLOW_HEADERS = (*default_headers, 'upload-offset')
+CORS_EXPOSE_HEADERS = ['Location', 'Upload-Offset', 'Upload-Length']
 
 # REST Framework settings
 REST_FRAMEWORK = {
@@ -135,4 +139,72 @@ REST_FRAMEWORK = {
 }
 
 # Stripe settings
-STRIPE_SECRET_KEY = os.environ.get('STRIPE_SECRET_KEY', '')
\ No newline at end of file
+STRIPE_SECRET_KEY = os.environ.get('STRIPE_SECRET_KEY', '')
+
+# News ingestion settings
+NEWS_INGEST_INTERVAL = int(os.environ.get('NEWS_INGEST_INTERVAL', '1800'))
+# 单轮抓取的总时间预算（秒）以及来源/文章并发线程数
+NEWS_FETCH_BUDGET = int(os.environ.get('NEWS_FETCH_BUDGET', '20'))
+NEWS_SOURCE_WORKERS = 8
+NEWS_ARTICLE_WORKERS = 16
+# 交给 crawler/ 下 Scrapy 爬虫抓取的来源，后台抓取任务跳过它们，例如 "OpenAI Blog,Google AI Blog"
+NEWS_DISABLED_SOURCES = [name.strip() for name in os.environ.get('NEWS_DISABLED_SOURCES', '').split(',') if name.strip()]
+# arXiv 多分类抓取：分类列表、每页条数（回填用更大的页），以及没有游标的分类首次回溯的天数
+NEWS_ARXIV_CATEGORIES = ['cs.AI', 'cs.LG', 'cs.CL', 'cs.CV', 'stat.ML']
+NEWS_ARXIV_PAGE_SIZE = 100
+NEWS_ARXIV_BACKFILL_PAGE_SIZE = 1000
+NEWS_ARXIV_INITIAL_DAYS = 2
+# 抓取用 HTTP 客户端：连接池大小，以及保存 ETag/Last-Modified 的目录
+HTTP_POOL_HOSTS = 20
+HTTP_POOL_SIZE = 16
+NEWS_HTTP_CACHE_DIR = os.environ.get('NEWS_HTTP_CACHE_DIR', os.path.join(BASE_DIR, 'news_cache'))
+# 文章正文磁盘缓存（位于 NEWS_HTTP_CACHE_DIR/articles）：多久内直接用缓存不发请求，以及总大小上限
+NEWS_ARTICLE_CACHE_TTL = int(os.environ.get('NEWS_ARTICLE_CACHE_TTL', '86400'))
+NEWS_ARTICLE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# 预编码的新闻列表快照：包含最新多少条，以及默认首页条数（需与列表接口默认 limit 一致）
+NEWS_SNAPSHOT_SIZE = 200
+NEWS_SNAPSHOT_DEFAULT_LIMIT = 50
+# 快照目录只在本机共享：Web 进程每隔这么多秒对比一次数据库，落后时在本机重新发布（worker 在别的容器时靠它更新）
+NEWS_SNAPSHOT_SYNC_INTERVAL = 30
+# 新闻 SSE 推送：每个进程轮询新条目的间隔、心跳间隔，以及单个连接最长保持时间（到时客户端自动重连）
+NEWS_STREAM_POLL_INTERVAL = 5
+NEWS_STREAM_HEARTBEAT = 15
+NEWS_STREAM_MAX_SECONDS = 300
+# 新闻离线翻译（需要 OPENAI_API_KEY）：目标语言、模型，每轮最多翻译多少条、只看最新多少条，
+# 以及每次调用的条数/字符上限和并发调用数
+NEWS_TRANSLATION_LANGUAGES = ['zh']
+NEWS_TRANSLATION_MODEL = os.environ.get('NEWS_TRANSLATION_MODEL', 'gpt-3.5-turbo')
+NEWS_TRANSLATION_MAX_ITEMS = 100
+NEWS_TRANSLATION_WINDOW = 500
+NEWS_TRANSLATION_BATCH_SIZE = 20
+NEWS_TRANSLATION_BATCH_CHARS = 6000
+NEWS_TRANSLATION_WORKERS = 4
+NEWS_TRANSLATION_TIMEOUT = 60
+# 每个主机两次请求之间的最小间隔（秒），所有抓取线程共享
+HTTP_HOST_MIN_INTERVAL = {'export.arxiv.org': 3}
+# 快照过期时由 Web 请求在后台触发刷新；租约超时时间应大于一轮抓取耗时
+NEWS_REFRESH_ON_REQUEST = os.environ.get('NEWS_REFRESH_ON_REQUEST', 'True').lower() == 'true'
+NEWS_REFRESH_LEASE_SECONDS = 300
+# 新闻来源熔断：连续失败次数阈值，以及熔断冷却时间（秒，随失败次数翻倍，有上限）
+NEWS_BREAKER_FAILURES = 3
+NEWS_BREAKER_COOLDOWN = 300
+NEWS_BREAKER_MAX_COOLDOWN = 3600
+
+# 断点续传上传：默认分块大小及客户端可选范围（字节），未完成会话的保留时间（秒）
+UPLOAD_CHUNK_SIZE = 5 * 1024 * 1024
+UPLOAD_MIN_CHUNK_SIZE = 256 * 1024
+UPLOAD_MAX_CHUNK_SIZE = 32 * 1024 * 1024
+UPLOAD_SESSION_TTL = 86400
+# 上传时边接收边计算 SHA-256，文件按内容去重存储（见 api/blob_store.py）
+FILE_UPLOAD_HANDLERS = [
+    'api.upload_handlers.HashingMemoryFileUploadHandler',
+    'api.upload_handlers.HashingTemporaryFileUploadHandler',
+]
+# 文件下载交给前端代理发送：'' 由 Django 发送（gunicorn 下整文件和单段 Range 走 sendfile），
+# 'x-accel' 用 nginx X-Accel-Redirect（需配置指向存储目录的 internal location），'x-sendfile' 用 Apache/lighttpd
+FILE_DOWNLOAD_OFFLOAD = os.environ.get('FILE_DOWNLOAD_OFFLOAD', '')
+FILE_DOWNLOAD_ACCEL_PREFIX = '/protected/'
+# 文件列表总数的缓存时间（秒）；增删文件时通过版本号立即失效，这里只兜底其他途径的改动
+FILE_COUNT_CACHE_SECONDS = 300
+# 公开文件列表每页渲染结果的缓存时间（秒）；公开文件增删改时通过数据库里的版本号让所有 worker 立即失效
+PUBLIC_FILES_CACHE_SECONDS = 300
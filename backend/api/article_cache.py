@@ -0,0 +1,227 @@
+"""文章正文的磁盘缓存：按规范化 URL 寻址，保存压缩后的原始 HTML（正文够长时只有读到的前一部分）、抽取出的正文和校验值"""
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from django.conf import settings
+from .extract import CHARSET_RE, CHUNK_SIZE, MAX_ARTICLE_BYTES
+
+class CacheEntry:
+    def __init__(self, meta, path):
+        self.meta = meta
+        self.path = path
+
+    @property
+    def text(self):
+        return self.meta['text']
+
+    @property
+    def html_hash(self):
+        return self.meta['html_hash']
+
+    @property
+    def truncated(self):
+        """Whether only a prefix of the page was read, because extraction stopped early"""
+        return self.meta.get('truncated', False)
+
+    def is_fresh(self, ttl):
+        return time.time() - self.meta['fetched_at'] < ttl
+
+    def validators(self):
+        """Conditional request headers for revalidating this entry"""
+        headers = {}
+        if self.meta.get('etag'):
+            headers['If-None-Match'] = self.meta['etag']
+        if self.meta.get('last_modified'):
+            headers['If-Modified-Since'] = self.meta['last_modified']
+        return headers
+
+class ArticleCache:
+    """One zlib file per article, revalidated after a TTL and evicted least recently used first
+
+    Each file is a JSON header line (url, validators, fetch time, encoding,
+    hash of the HTML, whether the HTML is truncated, and the extracted text)
+    followed by the raw HTML, all zlib-compressed. The HTML is whatever was
+    read before extraction had enough text, usually a prefix of the page. Within ``ttl`` an entry is served without touching the
+    network; after that it is revalidated with its ETag/Last-Modified. Reads
+    bump the file's mtime, and when the directory grows past ``max_bytes``
+    the least recently used files are removed first.
+    """
+
+    def __init__(self, directory, ttl, max_bytes):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.total_bytes = None
+        self.stats = {'hits': 0, 'revalidated': 0, 'unchanged': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+    def _path(self, key):
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest[:2], f'{digest}.z')
+
+    def count(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.stats)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            return None
+        header, _, _ = data.partition(b'\n')
+        try:
+            meta = json.loads(header)
+        except ValueError:
+            return None
+        if meta.get('url') != key:
+            return None
+        return CacheEntry(meta, path)
+
+    def read_html(self, entry):
+        """Raw HTML of an entry, for re-extracting without refetching"""
+        with open(entry.path, 'rb') as f:
+            return zlib.decompress(f.read()).partition(b'\n')[2]
+
+    def touch(self, entry, refetched=False):
+        """Mark an entry as used; refetched also restarts its TTL"""
+        if refetched:
+            entry.meta['fetched_at'] = time.time()
+            self._write(entry.path, entry.meta, self.read_html(entry))
+        else:
+            try:
+                os.utime(entry.path)
+            except OSError:
+                pass
+
+    def put(self, key, html, text, etag=None, last_modified=None, encoding=None, truncated=False):
+        meta = {
+            'url': key,
+            'etag': etag or '',
+            'last_modified': last_modified or '',
+            'fetched_at': time.time(),
+            'encoding': encoding,
+            'html_hash': hashlib.sha1(html).hexdigest(),
+            'truncated': truncated,
+            'text': text,
+        }
+        self._write(self._path(key), meta, html)
+        self.count('stores')
+
+    def _write(self, path, meta, html):
+        data = zlib.compress(json.dumps(meta, ensure_ascii=False).encode('utf-8') + b'\n' + html, 6)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            old_size = os.path.getsize(path)
+        except OSError:
+            old_size = 0
+        # 先写临时文件再替换，其他线程不会读到半个文件
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self.lock:
+            if self.total_bytes is None:
+                self.total_bytes = self._scan_size()
+            else:
+                self.total_bytes += len(data) - old_size
+            over = self.total_bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def _files(self):
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith('.z'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, stat
+
+    def _scan_size(self):
+        return sum(stat.st_size for _, stat in self._files())
+
+    def evict(self):
+        """Remove least recently used files until the cache is under 90% of max_bytes"""
+        files = sorted(self._files(), key=lambda item: item[1].st_mtime)
+        total = sum(stat.st_size for _, stat in files)
+        target = self.max_bytes * 0.9
+        evicted = 0
+        for path, stat in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= stat.st_size
+            evicted += 1
+        with self.lock:
+            self.total_bytes = total
+            self.stats['evictions'] += evicted
+        return evicted
+
+class BodyReader:
+    """Chunks of a streamed response that keeps the bytes handed out
+
+    Meant to be fed to extract_text, which stops pulling once it has enough
+    text, so the rest of the page is never downloaded; ``body`` is then the
+    prefix that was read and ``complete`` stays False. At most max_bytes are
+    read. The read timeout only bounds each socket read, so a slow body is
+    also cut off at `deadline` (a time.monotonic() value) with TimeoutError.
+    """
+
+    def __init__(self, response, max_bytes=MAX_ARTICLE_BYTES, deadline=None):
+        self.response = response
+        self.max_bytes = max_bytes
+        self.deadline = deadline
+        self.chunks = []
+        self.size = 0
+        self.complete = False
+
+    def __iter__(self):
+        for chunk in self.response.iter_content(CHUNK_SIZE):
+            if self.deadline is not None and time.monotonic() >= self.deadline:
+                raise TimeoutError('article body not read before the deadline')
+            chunk = chunk[:self.max_bytes - self.size]
+            self.chunks.append(chunk)
+            self.size += len(chunk)
+            yield chunk
+            if self.size >= self.max_bytes:
+                return
+        self.complete = True
+
+    @property
+    def body(self):
+        return b''.join(self.chunks)
+
+    def close(self):
+        self.response.close()
+
+def declared_charset(response):
+    match = CHARSET_RE.search(response.headers.get('Content-Type', ''))
+    return match.group(1) if match else None
+
+_article_cache = None
+
+def get_article_cache():
+    global _article_cache
+    if _article_cache is None:
+        cache_dir = getattr(settings, 'NEWS_HTTP_CACHE_DIR', os.path.join(settings.BASE_DIR, 'news_cache'))
+        _article_cache = ArticleCache(
+            os.path.join(cache_dir, 'articles'),
+            ttl=getattr(settings, 'NEWS_ARTICLE_CACHE_TTL', 86400),
+            max_bytes=getattr(settings, 'NEWS_ARTICLE_CACHE_MAX_BYTES', 256 * 1024 * 1024),
+        )
+    return _article_cache
@@ -0,0 +1,61 @@
+"""流式 Atom 解析：边下载边产出条目，处理完立即释放元素，内存占用与批量大小无关"""
+import io
+import re
+import xml.etree.ElementTree as ET
+
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+ARXIV_NS = '{http://arxiv.org/schemas/atom}'
+OPENSEARCH_NS = '{http://a9.com/-/spec/opensearch/1.1/}'
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+def _clean(text):
+    return WHITESPACE_RE.sub(' ', text or '').strip()
+
+def _normalize_entry(entry):
+    """Flatten one <entry> element into a plain dict"""
+    links = {
+        link.get('title') or link.get('rel', 'alternate'): link.get('href')
+        for link in entry.findall(f'{ATOM_NS}link')
+    }
+    primary = entry.find(f'{ARXIV_NS}primary_category')
+    published = entry.findtext(f'{ATOM_NS}published') or ''
+    return {
+        'id': _clean(entry.findtext(f'{ATOM_NS}id')),
+        'title': _clean(entry.findtext(f'{ATOM_NS}title')),
+        'summary': _clean(entry.findtext(f'{ATOM_NS}summary')),
+        'published': published.strip(),
+        'updated': (entry.findtext(f'{ATOM_NS}updated') or published).strip(),
+        'authors': [_clean(author.findtext(f'{ATOM_NS}name')) for author in entry.findall(f'{ATOM_NS}author')],
+        'categories': [category.get('term') for category in entry.findall(f'{ATOM_NS}category')],
+        'primary_category': primary.get('term') if primary is not None else None,
+        'links': links,
+    }
+
+def iter_atom_entries(source, feed_info=None):
+    """Yield normalized entries from an Atom document as they are parsed
+
+    ``source`` is a file-like object (e.g. a streamed ``response.raw``) or
+    bytes. Every finished entry is cleared from the tree, so memory stays
+    flat however many entries the feed holds. If ``feed_info`` is a dict, it
+    receives feed-level fields such as ``total_results``.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    root = None
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = elem
+            continue
+
+        if elem.tag == f'{ATOM_NS}entry':
+            yield _normalize_entry(elem)
+            # 条目都是 <feed> 的直接子元素，清空 root 即可释放已处理的条目
+            root.clear()
+        elif elem.tag == f'{OPENSEARCH_NS}totalResults' and feed_info is not None:
+            try:
+                feed_info['total_results'] = int(elem.text)
+            except (TypeError, ValueError):
+                pass
@@ -0,0 +1,120 @@
+"""内容寻址的文件存储：文件按 SHA-256 存一份，UploadedFile 通过引用计数共享，重复上传不占额外磁盘"""
+import hashlib
+import os
+import uuid
+from django.conf import settings
+from django.core.files.move import file_move_safe
+from django.core.files.storage import default_storage
+from django.db import transaction
+from .models import FileBlob
+
+HASH_BLOCK = 1024 * 1024
+
+def blob_name(sha256):
+    # 两级目录打散，避免单个目录下文件过多
+    return f'blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}'
+
+def hash_file(file):
+    """SHA-256 of a file object, for uploads that did not come through the hashing handlers"""
+    hasher = hashlib.sha256()
+    for chunk in file.chunks(HASH_BLOCK):
+        hasher.update(chunk)
+    file.seek(0)
+    return hasher.hexdigest()
+
+def hash_path(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+def stage_blob(path, write):
+    """Have `write` put the content in a temporary file next to `path`, returns its path"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    staged = f'{path}.{uuid.uuid4().hex}.tmp'
+    write(staged)
+    # 从临时文件改名过来的权限是 0600，和普通存储保持一致
+    if settings.FILE_UPLOAD_PERMISSIONS is not None:
+        os.chmod(staged, settings.FILE_UPLOAD_PERMISSIONS)
+    return staged
+
+def acquire_blob(sha256, size, write):
+    """Take one reference on the blob for `sha256`, creating it on first use
+
+    `write(path)` is only called when the content is not on disk yet. It
+    runs before the row is locked, into a temporary file in the blob's
+    directory; under the lock the file is only renamed into place.
+    Returns (blob, stored): stored is False when existing content was reused.
+    """
+    name = blob_name(sha256)
+    path = default_storage.path(name)
+    staged = None
+    try:
+        while True:
+            if staged is None and not os.path.exists(path):
+                staged = stage_blob(path, write)
+            with transaction.atomic():
+                blob, _ = FileBlob.objects.get_or_create(sha256=sha256, defaults={'file': name, 'size': size})
+                # 锁住这一行，与 release_blob 的减引用/删除互斥
+                blob = FileBlob.objects.select_for_update().filter(pk=blob.pk).first()
+                if blob is None:
+                    # 刚好被最后一个引用释放删掉了，重新创建
+                    continue
+                stored = not os.path.exists(path)
+                if stored:
+                    if staged is None:
+                        # 检查之后文件被 release_blob 删掉了，放开锁写好内容再来
+                        continue
+                    os.replace(staged, path)
+                    staged = None
+                blob.ref_count += 1
+                blob.save(update_fields=['ref_count'])
+                return blob, stored
+    finally:
+        # 内容已经有人存过，写好的临时文件用不上
+        if staged is not None:
+            os.remove(staged)
+
+def store_upload(uploaded_file):
+    """Store a request upload as a blob; duplicates are discarded without touching the disk"""
+    sha256 = getattr(uploaded_file, 'sha256', None) or hash_file(uploaded_file)
+
+    def write(path):
+        if hasattr(uploaded_file, 'temporary_file_path'):
+            # 大文件已在临时文件里，同一文件系统时直接改名
+            file_move_safe(uploaded_file.temporary_file_path(), path, allow_overwrite=True)
+        else:
+            with open(path, 'wb') as f:
+                for chunk in uploaded_file.chunks():
+                    f.write(chunk)
+
+    return acquire_blob(sha256, uploaded_file.size, write)
+
+def store_path(path, size, sha256):
+    """Store an assembled file (a finished resumable upload) as a blob, consuming `path`
+
+    `sha256` is the digest the caller computed while assembling the file.
+    """
+    blob, stored = acquire_blob(sha256, size, lambda target: os.replace(path, target))
+    if os.path.exists(path):
+        # 相同内容已经存在，没有用上
+        os.remove(path)
+    return blob, stored
+
+def release_blob(blob_id):
+    """Drop one reference; the last one deletes the row and the file"""
+    with transaction.atomic():
+        blob = FileBlob.objects.select_for_update().filter(pk=blob_id).first()
+        if blob is None:
+            return
+        blob.ref_count -= 1
+        if blob.ref_count > 0:
+            blob.save(update_fields=['ref_count'])
+            return
+        # 持锁删除文件，acquire_blob 不会看到“行已删但文件还在”的中间状态
+        try:
+            os.remove(default_storage.path(blob.file.name))
+        except FileNotFoundError:
+            pass
+        blob.delete()
@@ -0,0 +1,120 @@
+"""近重复新闻检测：SimHash 指纹 + 分段 LSH 索引，候选查找不随存档规模线性增长"""
+import hashlib
+from django.db.models import Q
+from django.utils import timezone
+from .news_search import tokenize
+
+SIMHASH_BITS = 64
+# 64 位指纹切成 4 段，每段 16 位。汉明距离 <= 3 时至少有一段完全相同（抽屉原理）
+BAND_COUNT = 4
+BAND_BITS = SIMHASH_BITS // BAND_COUNT
+MAX_HAMMING_DISTANCE = 3
+# 特征太少时指纹不可靠，不参与去重
+MIN_FEATURES = 8
+FINGERPRINT_CONTENT_CHARS = 1000
+
+def _feature_hash(feature):
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+
+def simhash(text):
+    """64-bit SimHash over word unigrams and bigrams, None if the text is too short"""
+    tokens = tokenize(text)
+    features = tokens + [f'{a} {b}' for a, b in zip(tokens, tokens[1:])]
+    if len(features) < MIN_FEATURES:
+        return None
+
+    weights = [0] * SIMHASH_BITS
+    for feature in features:
+        value = _feature_hash(feature)
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+def to_signed(value):
+    """Store unsigned 64-bit values in a signed BIGINT column"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+def to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+def bands(fingerprint):
+    mask = (1 << BAND_BITS) - 1
+    return [fingerprint >> (i * BAND_BITS) & mask for i in range(BAND_COUNT)]
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+def fingerprint_fields(title, excerpt, content):
+    """Model field values for an item's fingerprint and LSH bands"""
+    fingerprint = simhash(' '.join([title, excerpt, content[:FINGERPRINT_CONTENT_CHARS]]))
+    if fingerprint is None:
+        return {}
+    fields = {'simhash': to_signed(fingerprint)}
+    for i, band in enumerate(bands(fingerprint)):
+        fields[f'simhash_band{i}'] = band
+    return fields
+
+def find_canonicals(items):
+    """Cluster representatives for a batch of new, unsaved items
+
+    Returns a list parallel to items. A single band query covers the whole
+    batch; an item with no stored match becomes a candidate for the later
+    items of the same batch, so near-duplicates arriving together still
+    cluster.
+    """
+    from .models import NewsItem
+
+    band_fields = [f'simhash_band{i}' for i in range(BAND_COUNT)]
+    fingerprinted = [item for item in items if item.simhash is not None]
+    pool = []
+    if fingerprinted:
+        band_match = Q()
+        for name in band_fields:
+            band_match |= Q(**{f'{name}__in': {getattr(item, name) for item in fingerprinted}})
+        pool = list(
+            NewsItem.objects.filter(band_match, duplicate_of__isnull=True)
+            .only('id', 'news_id', 'simhash', 'alternate_sources', *band_fields)
+        )
+
+    canonicals = []
+    for item in items:
+        best = None
+        if item.simhash is not None:
+            fingerprint = to_unsigned(item.simhash)
+            for candidate in pool:
+                if not any(getattr(candidate, name) == getattr(item, name) for name in band_fields):
+                    continue
+                distance = hamming_distance(fingerprint, to_unsigned(candidate.simhash))
+                if distance <= MAX_HAMMING_DISTANCE and (best is None or distance < best[0]):
+                    best = (distance, candidate)
+            if best is None:
+                pool.append(item)
+        canonicals.append(best[1] if best else None)
+    return canonicals
+
+def attach_duplicates(pairs):
+    """Record each item as an alternate source on its cluster representative
+
+    pairs are (canonical, item); every changed representative is written
+    once, in a single bulk update.
+    """
+    from .models import NewsItem
+
+    changed = {}
+    for canonical, item in pairs:
+        alternates = list(canonical.alternate_sources or [])
+        if not any(alt.get('id') == item.news_id for alt in alternates):
+            alternates.append({'id': item.news_id, 'source': item.source, 'url': item.url})
+            canonical.alternate_sources = alternates
+            changed[canonical.pk] = canonical
+    if changed:
+        # bulk_update 不经过 auto_now，手动更新时间戳
+        now = timezone.now()
+        for canonical in changed.values():
+            canonical.updated_at = now
+        NewsItem.objects.bulk_update(list(changed.values()), ['alternate_sources', 'updated_at'])
@@ -0,0 +1,186 @@
+"""正文抽取：分块喂给增量解析器、边解析边收集正文，够长就停，不构建整棵 DOM 树"""
+import codecs
+import itertools
+import re
+from html.parser import HTMLParser
+
+try:
+    from lxml import etree
+except ImportError:  # lxml 不可用时退回标准库解析器
+    etree = None
+
+# 单篇文章最多读取的字节数
+MAX_ARTICLE_BYTES = 512 * 1024
+CHUNK_SIZE = 16 * 1024
+# 太短的段落通常是按钮、标签、版权声明之类的噪音
+MIN_PARAGRAPH_CHARS = 25
+
+# 整段跳过的标签
+SKIP_TAGS = {
+    'head', 'script', 'style', 'noscript', 'template', 'svg', 'canvas', 'iframe',
+    'nav', 'header', 'footer', 'aside', 'form', 'button', 'select',
+}
+# 遇到这些块级标签就切分段落
+BLOCK_TAGS = {
+    'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'blockquote', 'pre', 'div',
+    'section', 'article', 'main', 'td', 'th', 'dd', 'dt', 'figcaption', 'br', 'tr', 'ul', 'ol',
+}
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+    'source', 'track', 'wbr',
+}
+MAIN_TAGS = {'article', 'main'}
+# readability 风格的 class/id 正负向特征
+NEGATIVE_RE = re.compile(
+    r'comment|footer|footnote|masthead|menu|nav|sidebar|sponsor|share|social|related|'
+    r'promo|advert|\bads?\b|cookie|subscribe|newsletter|breadcrumb|popup|modal|banner',
+    re.I,
+)
+POSITIVE_RE = re.compile(r'article|body|content|entry|main|post|story|text', re.I)
+WHITESPACE_RE = re.compile(r'\s+')
+CHARSET_RE = re.compile(r'charset=["\']?([\w.:-]+)', re.I)
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w.:-]+)', re.I)
+
+class TextCollector:
+    """Streaming parse target that keeps main-content paragraphs
+
+    Works both as an lxml parser target and behind the stdlib adapter below.
+    Once ``max_chars`` of main-content text has been gathered, ``done`` turns
+    True and the caller stops reading the response.
+    """
+
+    def __init__(self, max_chars):
+        self.max_chars = max_chars
+        # (tag, skip, main) for every open element
+        self.stack = []
+        self.buffer = []
+        self.main_paragraphs = []
+        self.other_paragraphs = []
+        self.main_chars = 0
+
+    @property
+    def done(self):
+        return self.main_chars >= self.max_chars
+
+    def _flags(self):
+        return self.stack[-1][1:] if self.stack else (False, False)
+
+    def start(self, tag, attrib):
+        tag = str(tag).lower()
+        if tag in BLOCK_TAGS:
+            self._flush()
+        if tag in VOID_TAGS:
+            return
+        skip, main = self._flags()
+        hint = f"{attrib.get('class', '')} {attrib.get('id', '')}"
+        if tag in SKIP_TAGS or (not main and NEGATIVE_RE.search(hint)):
+            skip = True
+        if tag in MAIN_TAGS or attrib.get('itemprop') == 'articleBody' or (
+            tag in ('div', 'section') and POSITIVE_RE.search(hint) and not NEGATIVE_RE.search(hint)
+        ):
+            main = True
+        self.stack.append((tag, skip, main))
+
+    def end(self, tag):
+        tag = str(tag).lower()
+        if tag in BLOCK_TAGS:
+            self._flush()
+        # HTML 常有未闭合标签：弹到匹配的那一层为止，找不到就忽略
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i][0] == tag:
+                del self.stack[i:]
+                break
+
+    def data(self, text):
+        if not self._flags()[0]:
+            self.buffer.append(text)
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        self._flush()
+        return self.text()
+
+    def _flush(self):
+        if not self.buffer:
+            return
+        paragraph = WHITESPACE_RE.sub(' ', ''.join(self.buffer)).strip()
+        self.buffer = []
+        if len(paragraph) < MIN_PARAGRAPH_CHARS:
+            return
+        if self._flags()[1]:
+            self.main_paragraphs.append(paragraph)
+            self.main_chars += len(paragraph) + 1
+        else:
+            self.other_paragraphs.append(paragraph)
+
+    def text(self):
+        paragraphs = self.main_paragraphs or self.other_paragraphs
+        return ' '.join(paragraphs)[:self.max_chars]
+
+class _StdlibParser(HTMLParser):
+    """Feeds html.parser events into a TextCollector"""
+
+    def __init__(self, target):
+        super().__init__(convert_charrefs=True)
+        self.target = target
+
+    def handle_starttag(self, tag, attrs):
+        self.target.start(tag, {name: value or '' for name, value in attrs})
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.target.end(tag)
+
+    def handle_endtag(self, tag):
+        self.target.end(tag)
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+def extract_text(chunks, max_chars=2000, encoding=None, max_bytes=MAX_ARTICLE_BYTES):
+    """Extract main-content text from an iterable of HTML byte chunks
+
+    Stops reading as soon as enough main content has been collected or
+    ``max_bytes`` have been consumed.
+    """
+    chunks = iter(chunks)
+    first = next(chunks, b'')
+    if encoding is None:
+        # 没有声明编码时看前面的 <meta charset>，再没有就按 UTF-8
+        match = META_CHARSET_RE.search(first[:4096])
+        encoding = match.group(1).decode('ascii') if match else 'utf-8'
+    try:
+        codecs.lookup(encoding)
+    except LookupError:
+        encoding = 'utf-8'
+
+    collector = TextCollector(max_chars)
+    if etree is not None:
+        parser = etree.HTMLParser(target=collector, encoding=encoding, recover=True, no_network=True)
+        feed = parser.feed
+        finish = parser.close
+    else:
+        parser = _StdlibParser(collector)
+        decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+        feed = lambda chunk: parser.feed(decoder.decode(chunk))
+        finish = parser.close
+
+    consumed = 0
+    for chunk in itertools.chain([first], chunks):
+        if not chunk:
+            continue
+        chunk = chunk[:max_bytes - consumed]
+        consumed += len(chunk)
+        feed(chunk)
+        if collector.done or consumed >= max_bytes:
+            break
+
+    try:
+        finish()
+    except Exception:
+        # 提前停止时文档不完整，lxml 可能报错，已收集的内容仍然有效
+        collector.close()
+    return collector.text()
@@ -0,0 +1,73 @@
+"""文件列表的缓存：用户文件数和公开文件分页
+
+缓存是每个 worker 各自的本地缓存，版本号存在数据库（CacheVersion）里：
+信号在文件变化时把版本号加一，所有 worker 下次读到新版本就不再命中旧条目。
+"""
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from rest_framework.renderers import JSONRenderer
+from .models import CacheVersion, UploadedFile
+from .pagination import keyset_paginate
+from .serializers import UploadedFileSerializer
+
+PUBLIC_FILES_VERSION_KEY = 'files:public'
+
+def user_files_version_key(user_id):
+    return f'files:user:{user_id}'
+
+def cache_version(key):
+    return CacheVersion.objects.filter(key=key).values_list('version', flat=True).first() or 0
+
+def bump_cache_version(key):
+    """Increment a shared version; runs inside the caller's transaction, so it commits with the change"""
+    if CacheVersion.objects.filter(key=key).update(version=F('version') + 1):
+        return
+    try:
+        with transaction.atomic():
+            CacheVersion.objects.create(key=key, version=1)
+    except IntegrityError:
+        # 另一个进程刚建好了这一行
+        CacheVersion.objects.filter(key=key).update(version=F('version') + 1)
+
+def user_file_count(user_id):
+    """用户文件总数，按该用户的版本号缓存；新增/删除文件时版本号由信号加一"""
+    key = f'files:count:{user_id}:{cache_version(user_files_version_key(user_id))}'
+    count = cache.get(key)
+    if count is None:
+        count = UploadedFile.objects.filter(user_id=user_id).count()
+        cache.set(key, count, getattr(settings, 'FILE_COUNT_CACHE_SECONDS', 300))
+    return count
+
+def public_files_page(request, cursor, limit):
+    """Rendered JSON body of one public-files page, from cache when possible
+
+    A cache hit costs one query, the version lookup. Raises ValueError for
+    a malformed cursor.
+    """
+    version = cache_version(PUBLIC_FILES_VERSION_KEY)
+    # download_url 是绝对地址，不同域名访问要分开缓存
+    page = hashlib.sha1(f"{request.scheme}://{request.get_host()}|{cursor or ''}|{limit}".encode('utf-8')).hexdigest()
+    key = f'files:public:{version}:{page}'
+    body = cache.get(key)
+    if body is None:
+        # 按 (upload_date, id) 倒序走 is_public 的部分索引
+        queryset = UploadedFile.objects.filter(is_public=True).select_related('user')
+        files, next_cursor = keyset_paginate(queryset, 'upload_date', cursor, limit)
+        body = JSONRenderer().render({
+            'files': UploadedFileSerializer(files, many=True, context={'request': request}).data,
+            'total_count': public_file_count(version),
+            'next_cursor': next_cursor,
+        })
+        cache.set(key, body, getattr(settings, 'PUBLIC_FILES_CACHE_SECONDS', 300))
+    return body
+
+def public_file_count(version):
+    key = f'files:public:{version}:count'
+    count = cache.get(key)
+    if count is None:
+        count = UploadedFile.objects.filter(is_public=True).count()
+        cache.set(key, count, getattr(settings, 'PUBLIC_FILES_CACHE_SECONDS', 300))
+    return count
@@ -0,0 +1,178 @@
+"""文件下载：条件请求、Range/多段 Range（206），可选交给前端代理（X-Accel-Redirect/X-Sendfile）发送"""
+import os
+import re
+import secrets
+from urllib.parse import quote
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+RANGE_RE = re.compile(r'^\s*(\d*)\s*-\s*(\d*)\s*$')
+# 超过这么多段的 Range 直接忽略，返回整个文件，防止用大量小段放大开销
+MAX_RANGES = 16
+BLOCK_SIZE = 64 * 1024
+
+class FileRange:
+    """A window [start, start + length) of an open file, for FileResponse
+
+    Exposes fileno() with the file positioned at `start`, so gunicorn's
+    wsgi.file_wrapper sends exactly Content-Length bytes with sendfile();
+    other servers fall back to read(), which never goes past the window.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+def parse_range(header, size):
+    """Byte ranges from a Range header as sorted, merged (start, end) pairs
+
+    Returns None when the header should be ignored (malformed, other units,
+    too many ranges) and [] when no range overlaps the file (416).
+    """
+    units, _, spec = header.partition('=')
+    if units.strip().lower() != 'bytes' or not spec:
+        return None
+    ranges = []
+    for part in spec.split(','):
+        match = RANGE_RE.match(part)
+        if not match or match.groups() == ('', ''):
+            return None
+        first, last = match.groups()
+        if not first:
+            # 后缀形式 bytes=-500：最后 500 字节
+            if int(last) > 0 and size > 0:
+                ranges.append((max(0, size - int(last)), size - 1))
+            continue
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        if start < size:
+            ranges.append((start, min(int(last), size - 1) if last else size - 1))
+    if len(ranges) > MAX_RANGES:
+        return None
+
+    # 重叠或相邻的段合并，客户端重复请求同一段时不会成倍发送
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def if_range_matches(request, etag, last_modified):
+    """If-Range: ranges only apply while the client's copy is still current"""
+    value = request.headers.get('If-Range')
+    if not value:
+        return True
+    if value.startswith(('"', 'W/')):
+        # 只能用强 ETag 比较
+        return value == etag
+    return parse_http_date_safe(value) == last_modified
+
+def offload_response(name, path):
+    """Empty response telling the front proxy to send the file, or None when not configured"""
+    mode = getattr(settings, 'FILE_DOWNLOAD_OFFLOAD', '')
+    if mode == 'x-accel':
+        # nginx 需要一个 internal location 指向存储目录，Range 由 nginx 处理
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = getattr(settings, 'FILE_DOWNLOAD_ACCEL_PREFIX', '/protected/') + quote(name)
+        return response
+    if mode == 'x-sendfile':
+        response = HttpResponse()
+        response['X-Sendfile'] = path
+        return response
+    return None
+
+def multipart_response(path, ranges, size, content_type):
+    boundary = secrets.token_hex(16)
+    heads = [
+        f"\r\n--{boundary}\r\nContent-Type: {content_type}\r\nContent-Range: bytes {start}-{end}/{size}\r\n\r\n".encode('ascii')
+        for start, end in ranges
+    ]
+    tail = f"\r\n--{boundary}--\r\n".encode('ascii')
+
+    def body():
+        with open(path, 'rb') as f:
+            for head, (start, end) in zip(heads, ranges):
+                yield head
+                f.seek(start)
+                remaining = end - start + 1
+                while remaining:
+                    block = f.read(min(BLOCK_SIZE, remaining))
+                    if not block:
+                        return
+                    remaining -= len(block)
+                    yield block
+        yield tail
+
+    response = StreamingHttpResponse(body(), status=206, content_type=f'multipart/byteranges; boundary={boundary}')
+    response['Content-Length'] = str(sum(len(head) for head in heads) + sum(end - start + 1 for start, end in ranges) + len(tail))
+    return response
+
+def serve_file(request, name, content_type, filename, etag=None):
+    """Download response for a stored file, honouring conditional and Range requests
+
+    `name` is the storage name; `etag` should be a strong, quoted validator
+    when one is known (blob files use their SHA-256), otherwise one is
+    derived from size and mtime.
+    """
+    path = default_storage.path(name)
+    stat = os.stat(path)
+    size = stat.st_size
+    last_modified = int(stat.st_mtime)
+    etag = etag or f'"{size:x}-{stat.st_mtime_ns:x}"'
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = offload_response(name, path)
+    if response is None:
+        ranges = None
+        if request.headers.get('Range') and if_range_matches(request, etag, last_modified):
+            ranges = parse_range(request.headers['Range'], size)
+        if ranges == []:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+        elif ranges and len(ranges) > 1:
+            response = multipart_response(path, ranges, size, content_type)
+        elif ranges:
+            start, end = ranges[0]
+            response = FileResponse(FileRange(open(path, 'rb'), start, end - start + 1), status=206)
+            response['Content-Length'] = str(end - start + 1)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        else:
+            # 整个文件：gunicorn 等服务器对 FileResponse 用 sendfile 零拷贝发送
+            response = FileResponse(open(path, 'rb'))
+
+    if response.status_code in (200, 206):
+        if not response.get('Content-Type', '').startswith('multipart/'):
+            response['Content-Type'] = content_type
+        response['Content-Disposition'] = content_disposition_header(True, filename)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+def starts_download(request, response):
+    """Whether this response begins a download, as opposed to a resumed or partial fetch"""
+    if response.status_code not in (200, 206):
+        return False
+    header = request.headers.get('Range', '')
+    return not header or bool(re.match(r'^\s*bytes\s*=\s*0\s*-', header))
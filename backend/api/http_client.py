@@ -0,0 +1,154 @@
+"""抓取用的共享 HTTP 客户端：按主机复用长连接，并用磁盘上的 ETag/Last-Modified 做条件请求"""
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = 'AiroamNewsBot/1.0 (+https://airoam.net)'
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """Process-wide session; urllib3 keeps one keep-alive pool per host"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=getattr(settings, 'HTTP_POOL_HOSTS', 20),
+                    pool_maxsize=getattr(settings, 'HTTP_POOL_SIZE', 16),
+                    max_retries=0,
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers['User-Agent'] = USER_AGENT
+                _session = session
+    return _session
+
+def mount_transport(adapter):
+    """Route all requests of the shared session through adapter, e.g. record/replay"""
+    session = get_session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+class ValidatorStore:
+    """ETag/Last-Modified per URL, persisted as one JSON file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.validators = None
+
+    def _load(self):
+        if self.validators is None:
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    self.validators = json.load(f)
+            except (OSError, ValueError):
+                self.validators = {}
+        return self.validators
+
+    def get(self, url):
+        with self.lock:
+            return self._load().get(url)
+
+    def set(self, url, etag, last_modified):
+        with self.lock:
+            validators = self._load()
+            entry = {'etag': etag, 'last_modified': last_modified}
+            if validators.get(url) == entry:
+                return
+            validators[url] = entry
+            # 先写临时文件再替换，避免并发读到半个文件
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(validators, f)
+            os.replace(tmp_path, self.path)
+
+_validator_store = None
+
+def get_validator_store():
+    global _validator_store
+    if _validator_store is None:
+        cache_dir = getattr(settings, 'NEWS_HTTP_CACHE_DIR', os.path.join(settings.BASE_DIR, 'news_cache'))
+        _validator_store = ValidatorStore(os.path.join(cache_dir, 'validators.json'))
+    return _validator_store
+
+class HostRateLimiter:
+    """Minimum interval between requests to the same host, shared by all threads
+
+    Each caller reserves the next free slot under the lock and sleeps outside
+    it, so concurrent callers queue up evenly spaced instead of bunching.
+    """
+
+    def __init__(self, intervals):
+        self.intervals = intervals
+        self.lock = threading.Lock()
+        self.next_slot = {}
+
+    def delay(self, host):
+        """Seconds until a request to host would be allowed"""
+        with self.lock:
+            return max(0.0, self.next_slot.get(host, 0.0) - time.monotonic())
+
+    def wait(self, host):
+        interval = self.intervals.get(host)
+        if not interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, 0.0))
+            self.next_slot[host] = slot + interval
+        if slot > now:
+            time.sleep(slot - now)
+
+_rate_limiter = None
+
+def get_rate_limiter():
+    global _rate_limiter
+    if _rate_limiter is None:
+        # arXiv API 礼仪：同一客户端两次请求之间至少间隔 3 秒
+        _rate_limiter = HostRateLimiter(getattr(settings, 'HTTP_HOST_MIN_INTERVAL', {'export.arxiv.org': 3}))
+    return _rate_limiter
+
+def http_get(url, params=None, timeout=10, **kwargs):
+    """Plain GET over the shared pooled session, spaced per host by the rate limiter"""
+    get_rate_limiter().wait(urlsplit(url).hostname)
+    return get_session().get(url, params=params, timeout=timeout, **kwargs)
+
+def validator_key(url, params=None):
+    return requests.Request('GET', url, params=params).prepare().url
+
+def remember_validators(url, response, params=None):
+    """Store a 200 response's ETag/Last-Modified for the next conditional_get"""
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if etag or last_modified:
+        get_validator_store().set(validator_key(url, params), etag, last_modified)
+
+def conditional_get(url, params=None, timeout=10, remember=True, **kwargs):
+    """GET that sends stored validators; callers treat status 304 as 'unchanged'
+
+    With remember=False the caller stores the validators itself, through
+    remember_validators, once it has fully processed the response.
+    """
+    store = get_validator_store()
+    headers = dict(kwargs.pop('headers', None) or {})
+    validators = store.get(validator_key(url, params))
+    if validators:
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+
+    response = http_get(url, params=params, timeout=timeout, headers=headers, **kwargs)
+    if remember and response.status_code == 200:
+        remember_validators(url, response, params)
+    return response
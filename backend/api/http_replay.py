@@ -0,0 +1,153 @@
+"""离线录制/回放抓取流量：录制真实响应到 cassette 文件，回放时可注入延迟和错误，并统计外呼次数"""
+import base64
+import gzip
+import io
+import json
+import random
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from urllib3.response import HTTPResponse
+
+# 回放的 body 已经解压过，这些头不能原样带回去
+DROP_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'connection'}
+
+def _open(path, mode):
+    return gzip.open(path, mode + 't', encoding='utf-8') if path.endswith('.gz') else open(path, mode, encoding='utf-8')
+
+def build_response(adapter, request, status, reason, headers, body):
+    """A requests Response over in-memory bytes; both .raw and iter_content work"""
+    headers = {name: value for name, value in headers.items() if name.lower() not in DROP_HEADERS}
+    headers['Content-Length'] = str(len(body))
+    raw = HTTPResponse(
+        body=io.BytesIO(body), headers=headers, status=status, reason=reason,
+        preload_content=False, decode_content=False,
+    )
+    return adapter.build_response(request, raw)
+
+class Cassette:
+    """Recorded responses keyed by method and full URL
+
+    Repeated requests for the same URL replay the recorded responses in
+    order, then keep returning the last one.
+    """
+
+    def __init__(self, interactions=None):
+        self.interactions = {}
+        self.positions = Counter()
+        self.lock = threading.Lock()
+        for interaction in interactions or []:
+            self.interactions.setdefault(self.key(interaction['method'], interaction['url']), []).append(interaction)
+
+    @staticmethod
+    def key(method, url):
+        return f"{method.upper()} {url}"
+
+    @classmethod
+    def load(cls, path):
+        with _open(path, 'r') as f:
+            return cls(json.load(f)['interactions'])
+
+    def save(self, path):
+        interactions = [item for items in self.interactions.values() for item in items]
+        with _open(path, 'w') as f:
+            json.dump({'version': 1, 'interactions': interactions}, f)
+        return len(interactions)
+
+    def add(self, request, response, body):
+        interaction = {
+            'method': request.method,
+            'url': request.url,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': dict(response.headers),
+            'body': base64.b64encode(body).decode('ascii'),
+        }
+        with self.lock:
+            self.interactions.setdefault(self.key(request.method, request.url), []).append(interaction)
+
+    def next(self, method, url):
+        key = self.key(method, url)
+        with self.lock:
+            recorded = self.interactions.get(key)
+            if not recorded:
+                return None
+            position = self.positions[key]
+            self.positions[key] += 1
+        return recorded[min(position, len(recorded) - 1)]
+
+class CallCounter:
+    """Outbound requests per host, shared by the recording and replay adapters"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = Counter()
+
+    def count(self, url):
+        with self.lock:
+            self.calls[urlsplit(url).hostname] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return Counter(self.calls)
+
+class RecordingAdapter(HTTPAdapter):
+    """Real HTTP, with every response body captured into a cassette"""
+
+    def __init__(self, cassette, counter=None, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+        self.counter = counter or CallCounter()
+
+    def send(self, request, **kwargs):
+        self.counter.count(request.url)
+        response = super().send(request, **kwargs)
+        body = response.content
+        self.cassette.add(request, response, body)
+        return build_response(self, request, response.status_code, response.reason, response.headers, body)
+
+class ReplayAdapter(BaseAdapter):
+    """Serves requests from a cassette, never touching the network
+
+    ``latency`` (seconds) plus up to ``jitter`` is slept before each
+    response; ``error_rate`` of the calls fail with a ConnectionError. The
+    random source is seeded so runs are repeatable. Unrecorded URLs fail
+    the same way a dead host would.
+    """
+
+    def __init__(self, cassette, latency=0.0, jitter=0.0, error_rate=0.0, seed=0, counter=None):
+        super().__init__()
+        self.cassette = cassette
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counter = counter or CallCounter()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        self.counter.count(request.url)
+        with self.lock:
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            fail = self.random.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise requests.ConnectionError(f"Injected failure for {request.url}", request=request)
+
+        interaction = self.cassette.next(request.method, request.url)
+        if interaction is None:
+            raise requests.ConnectionError(f"Not in cassette: {request.method} {request.url}", request=request)
+        return build_response(
+            self, request, interaction['status'], interaction['reason'], interaction['headers'],
+            base64.b64decode(interaction['body']),
+        )
+
+    def build_response(self, request, raw):
+        return HTTPAdapter.build_response(self, request, raw)
+
+    def close(self):
+        pass
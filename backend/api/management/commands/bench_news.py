@@ -0,0 +1,171 @@
+import json
+import tempfile
+import time
+import tracemalloc
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from api import article_cache, http_client, news_snapshot
+from api.dedup import fingerprint_fields
+from api.http_replay import Cassette, CallCounter, RecordingAdapter, ReplayAdapter
+from api.news import enabled_sources, upsert_news_items
+from api.news_snapshot import publish_snapshot
+
+# 回归判定时忽略小于这个值（毫秒）的 CPU 差异，避免噪音误报
+NOISE_FLOOR_MS = 5
+
+
+class Command(BaseCommand):
+    help = '新闻管道离线基准：录制或回放来源的 HTTP 响应，按阶段统计耗时、CPU、内存分配和外呼次数'
+
+    def add_arguments(self, parser):
+        mode = parser.add_mutually_exclusive_group(required=True)
+        mode.add_argument('--record', metavar='CASSETTE', help='联网运行并把响应录制到该文件（.gz 结尾则压缩）')
+        mode.add_argument('--cassette', metavar='CASSETTE', help='从该文件回放，不访问网络')
+        parser.add_argument('--latency', type=float, default=0, help='回放时每次请求注入的延迟（毫秒）')
+        parser.add_argument('--jitter', type=float, default=0, help='在延迟之上再随机增加 0..jitter 毫秒')
+        parser.add_argument('--error-rate', type=float, default=0, help='回放时请求失败的比例（0-1）')
+        parser.add_argument('--seed', type=int, default=0, help='延迟抖动和错误注入的随机种子')
+        parser.add_argument('--repeat', type=int, default=2, help='运行次数；第一次是冷缓存，之后是增量抓取')
+        parser.add_argument('--rate-limit', action='store_true', help='回放时也遵守每主机最小请求间隔')
+        parser.add_argument('--json', metavar='PATH', help='把结果写成 JSON，可作为以后的 --baseline')
+        parser.add_argument('--baseline', metavar='PATH', help='与之前 --json 的结果比较，CPU 或内存峰值回退则报错')
+        parser.add_argument('--tolerance', type=float, default=0.25, help='允许相对基线回退的比例')
+
+    def handle(self, *args, **options):
+        counter = CallCounter()
+        if options['record']:
+            cassette = Cassette()
+            adapter = RecordingAdapter(cassette, counter)
+        else:
+            cassette = Cassette.load(options['cassette'])
+            adapter = ReplayAdapter(
+                cassette, latency=options['latency'] / 1000, jitter=options['jitter'] / 1000,
+                error_rate=options['error_rate'], seed=options['seed'], counter=counter,
+            )
+
+        overrides = {'NEWS_REFRESH_ON_REQUEST': False}
+        if options['cassette'] and not options['rate_limit']:
+            overrides['HTTP_HOST_MIN_INTERVAL'] = {}
+
+        # 缓存目录和数据库都用临时的，基准不会碰到真实数据，每次从同样的初始状态开始
+        with tempfile.TemporaryDirectory() as cache_dir, override_settings(NEWS_HTTP_CACHE_DIR=cache_dir, **overrides):
+            self.reset_singletons()
+            http_client.mount_transport(adapter)
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            tracemalloc.start()
+            try:
+                runs = [self.run_once(counter) for _ in range(options['repeat'])]
+            finally:
+                tracemalloc.stop()
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                http_client._session = None
+                self.reset_singletons()
+
+        for i, stages in enumerate(runs, 1):
+            self.report(f"run {i} ({'cold' if i == 1 else 'warm'})", stages)
+
+        if options['record']:
+            count = cassette.save(options['record'])
+            self.stdout.write(f"recorded {count} responses to {options['record']}")
+        if options['json']:
+            with open(options['json'], 'w', encoding='utf-8') as f:
+                json.dump({'runs': runs}, f, indent=2)
+        if options['baseline']:
+            self.compare(runs, options['baseline'], options['tolerance'])
+
+    @staticmethod
+    def reset_singletons():
+        http_client._validator_store = None
+        http_client._rate_limiter = None
+        article_cache._article_cache = None
+        news_snapshot._snapshot = None
+
+    def run_once(self, counter):
+        stages = []
+        items = []
+        for name, fetch in enabled_sources().items():
+            # 逐个来源串行跑，每个阶段的 CPU 和外呼都能单独归属
+            result = self.measure(stages, f'fetch:{name}', counter, lambda: fetch(None))
+            items.extend(result or [])
+
+        def sort():
+            items.sort(key=lambda x: x.get('timestamp', 0), reverse=True)
+            return items
+
+        def dedup():
+            return [fingerprint_fields(item['title'], item.get('excerpt') or '', item.get('content') or '') for item in items]
+
+        def store():
+            upsert_news_items(items)
+            return items
+
+        self.measure(stages, 'sort', counter, sort)
+        self.measure(stages, 'dedup', counter, dedup)
+        self.measure(stages, 'store', counter, store)
+        self.measure(stages, 'snapshot', counter, publish_snapshot)
+        return stages
+
+    @staticmethod
+    def measure(stages, name, counter, func):
+        calls_before = counter.snapshot()
+        tracemalloc.reset_peak()
+        memory_before = tracemalloc.get_traced_memory()[0]
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        error = None
+        try:
+            result = func()
+        except Exception as e:
+            result = None
+            error = f"{type(e).__name__}: {e}"
+        cpu = time.process_time() - cpu_started
+        wall = time.perf_counter() - wall_started
+        memory_after, peak = tracemalloc.get_traced_memory()
+        calls = counter.snapshot()
+        calls.subtract(calls_before)
+
+        stages.append({
+            'stage': name,
+            'wall_ms': round(wall * 1000, 1),
+            'cpu_ms': round(cpu * 1000, 1),
+            'alloc_kb': round((memory_after - memory_before) / 1024, 1),
+            'peak_kb': round((peak - memory_before) / 1024, 1),
+            'calls': sum(calls.values()),
+            'items': len(result) if isinstance(result, (list, tuple)) else None,
+            'error': error,
+        })
+        return result
+
+    def report(self, title, stages):
+        self.stdout.write(title)
+        self.stdout.write(f"  {'stage':<24}{'wall ms':>10}{'cpu ms':>10}{'alloc KB':>10}{'peak KB':>10}{'calls':>7}{'items':>7}")
+        for stage in stages:
+            items = '' if stage['items'] is None else stage['items']
+            self.stdout.write(
+                f"  {stage['stage']:<24}{stage['wall_ms']:>10}{stage['cpu_ms']:>10}{stage['alloc_kb']:>10}"
+                f"{stage['peak_kb']:>10}{stage['calls']:>7}{items:>7}"
+            )
+            if stage['error']:
+                self.stdout.write(f"    error: {stage['error']}")
+        self.stdout.write(
+            f"  {'total':<24}{round(sum(s['wall_ms'] for s in stages), 1):>10}"
+            f"{round(sum(s['cpu_ms'] for s in stages), 1):>10}{'':>20}{sum(s['calls'] for s in stages):>7}"
+        )
+
+    def compare(self, runs, path, tolerance):
+        with open(path, encoding='utf-8') as f:
+            baseline = json.load(f)['runs']
+        regressions = []
+        for i, (stages, base_stages) in enumerate(zip(runs, baseline), 1):
+            base_by_name = {stage['stage']: stage for stage in base_stages}
+            for stage in stages:
+                base = base_by_name.get(stage['stage'])
+                if base is None:
+                    continue
+                for metric, floor in (('cpu_ms', NOISE_FLOOR_MS), ('peak_kb', 64)):
+                    if stage[metric] > base[metric] * (1 + tolerance) and stage[metric] - base[metric] > floor:
+                        regressions.append(f"run {i} {stage['stage']} {metric}: {base[metric]} -> {stage[metric]}")
+        if regressions:
+            raise CommandError("performance regressions:\n" + "\n".join(regressions))
+        self.stdout.write(f"no regressions against {path} (tolerance {tolerance:.0%})")
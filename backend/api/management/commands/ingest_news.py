@@ -0,0 +1,56 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api.news_refresh import refresh_news
+
+
+class Command(BaseCommand):
+    help = '抓取新闻源并写入 NewsItem 表（--loop 模式下按固定间隔持续运行）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='持续运行，每隔 --interval 秒抓取一次')
+        parser.add_argument('--interval', type=int, default=getattr(settings, 'NEWS_INGEST_INTERVAL', 1800), help='抓取间隔（秒）')
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            try:
+                # 与 Web 进程共用同一个租约，避免两边同时抓取
+                stats = refresh_news()
+                if stats is None:
+                    self.stdout.write("another process is refreshing news, skipped")
+                else:
+                    self.report(stats, started)
+            except Exception as e:
+                # 循环模式下单次失败不应终止 worker
+                self.stderr.write(f"News ingestion failed: {e}")
+                if not options['loop']:
+                    raise
+
+            if not options['loop']:
+                break
+            time.sleep(max(0, options['interval'] - (time.monotonic() - started)))
+
+    def report(self, stats, started):
+        self.stdout.write(
+            f"fetched={stats['fetched']} created={stats['created']} updated={stats['updated']} "
+            f"duplicates={stats['duplicates']} "
+            f"elapsed={time.monotonic() - started:.1f}s"
+        )
+        cache = stats['article_cache']
+        lookups = cache['hits'] + cache['revalidated'] + cache['unchanged'] + cache['misses']
+        if lookups:
+            # hits 不发请求，revalidated/unchanged 有请求但不用重新解析
+            self.stdout.write(
+                f"article cache: hits={cache['hits']} revalidated={cache['revalidated']} "
+                f"unchanged={cache['unchanged']} misses={cache['misses']} "
+                f"hit_rate={(lookups - cache['misses']) / lookups:.0%}"
+            )
+        for lang, translated in stats['translated'].items():
+            if translated and (translated['translated'] or translated['failed_batches']):
+                self.stdout.write(
+                    f"translated {lang}: {translated['translated']} items, "
+                    f"failed_batches={translated['failed_batches']}"
+                )
+        if stats['missed_sources']:
+            self.stdout.write(f"missed deadline: {', '.join(stats['missed_sources'])}")
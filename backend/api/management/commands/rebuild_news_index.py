@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from api.news_search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = '重建新闻全文检索的倒排索引'
+
+    def handle(self, *args, **options):
+        count = rebuild_index()
+        self.stdout.write(f"indexed {count} news items")
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from api.news_translate import translate_pending, translation_languages
+
+
+class Command(BaseCommand):
+    help = '批量翻译最新新闻的标题和摘要（ingest_news 每轮也会翻译一部分，这里用于首次回填）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lang', nargs='+', help='目标语言，默认使用 NEWS_TRANSLATION_LANGUAGES')
+        parser.add_argument('--limit', type=int, default=getattr(settings, 'NEWS_TRANSLATION_WINDOW', 500), help='每种语言最多翻译多少条')
+
+    def handle(self, *args, **options):
+        for lang in options['lang'] or translation_languages():
+            stats = translate_pending(lang, limit=options['limit'])
+            if stats is None:
+                raise CommandError('OPENAI_API_KEY is not set')
+            self.stdout.write(
+                f"{lang}: pending={stats['pending']} translated={stats['translated']} "
+                f"failed_batches={stats['failed_batches']}"
+            )
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:59
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NewsItem",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("url", models.CharField(max_length=500, unique=True)),
+                ("title", models.CharField(max_length=500)),
+                ("excerpt", models.TextField(blank=True)),
+                ("content", models.TextField(blank=True)),
+                ("category", models.CharField(max_length=50)),
+                ("source", models.CharField(max_length=100)),
+                ("image", models.CharField(default="/globe.svg", max_length=255)),
+                (
+                    "published_at",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ["-published_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0003_newssource"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="newssource",
+            name="cursor",
+            field=models.CharField(blank=True, default="", max_length=100),
+        ),
+    ]
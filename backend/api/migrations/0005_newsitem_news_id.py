@@ -0,0 +1,74 @@
+import hashlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from django.db import migrations, models
+
+
+# 与写这个迁移时 api.news.canonical_url / news_id_for_url 的规则一致，
+# 复制在这里，以后改动应用代码不会影响已有数据的迁移结果
+def news_id_for_url(url):
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(
+        sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not key.lower().startswith("utm_")
+        )
+    )
+    path = parts.path.rstrip("/") or "/"
+    canonical = urlunsplit(("https", host, path, query, ""))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def populate_news_ids(apps, schema_editor):
+    NewsItem = apps.get_model("api", "NewsItem")
+    for item in NewsItem.objects.all():
+        item.news_id = news_id_for_url(item.url)
+        item.save(update_fields=["news_id"])
+
+    # http/https、www.、结尾斜杠、跟踪参数不同的旧记录会得到同一个 news_id：
+    # 保留最近更新的一条，缺的正文/摘要从其他记录补上，其余删除，之后才能加唯一约束
+    duplicated = (
+        NewsItem.objects.values("news_id")
+        .annotate(rows=models.Count("id"))
+        .filter(rows__gt=1)
+        .values_list("news_id", flat=True)
+    )
+    for news_id in list(duplicated):
+        items = list(
+            NewsItem.objects.filter(news_id=news_id).order_by("-updated_at", "-id")
+        )
+        keep, others = items[0], items[1:]
+        for field in ("content", "excerpt"):
+            if not getattr(keep, field):
+                setattr(
+                    keep,
+                    field,
+                    next((getattr(o, field) for o in others if getattr(o, field)), ""),
+                )
+        keep.save(update_fields=["content", "excerpt"])
+        NewsItem.objects.filter(pk__in=[o.pk for o in others]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0004_newssource_cursor"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="newsitem",
+            name="news_id",
+            field=models.CharField(max_length=16, null=True),
+        ),
+        migrations.RunPython(populate_news_ids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="newsitem",
+            name="news_id",
+            field=models.CharField(max_length=16, unique=True),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0005_newsitem_news_id"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NewsTerm",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("term", models.CharField(max_length=64, unique=True)),
+                ("doc_freq", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="newsitem",
+            name="doc_length",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name="NewsPosting",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("term", models.CharField(max_length=64)),
+                ("tf", models.IntegerField()),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="postings",
+                        to="api.newsitem",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["term", "-tf"], name="api_posting_term_tf")
+                ],
+                "unique_together": {("term", "item")},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0007_newsitem_updated_at_index"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="newsitem",
+            options={"ordering": ["-published_at", "-id"]},
+        ),
+        migrations.AddIndex(
+            model_name="newsitem",
+            index=models.Index(
+                fields=["-published_at", "-id"], name="api_news_published_id"
+            ),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0008_newsitem_keyset_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="newsitem",
+            name="alternate_sources",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name="newsitem",
+            name="duplicate_of",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="duplicates",
+                to="api.newsitem",
+            ),
+        ),
+        migrations.AddField(
+            model_name="newsitem",
+            name="simhash",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="newsitem",
+            name="simhash_band0",
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="newsitem",
+            name="simhash_band1",
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="newsitem",
+            name="simhash_band2",
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="newsitem",
+            name="simhash_band3",
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0010_newsrefreshlease"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="newssource",
+            name="circuit_open_until",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="newssource",
+            name="consecutive_failures",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="newssource",
+            name="last_error",
+            field=models.TextField(blank=True, default=""),
+        ),
+        migrations.AddField(
+            model_name="newssource",
+            name="recent_calls",
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:14
+
+from django.db import migrations, models
+
+
+def seed_category_cursor(apps, schema_editor):
+    # 之前只抓 cs.AI，旧的 arXiv 游标就是 cs.AI 分类的游标
+    NewsSource = apps.get_model("api", "NewsSource")
+    old = NewsSource.objects.filter(name="arXiv").exclude(cursor="").first()
+    if old:
+        NewsSource.objects.get_or_create(
+            name="arXiv:cs.AI", defaults={"cursor": old.cursor}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0011_newssource_breaker"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="newssource",
+            name="checkpoint",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.RunPython(seed_category_cursor, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0012_newssource_checkpoint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CrawlPage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("url", models.URLField(max_length=500, unique=True)),
+                ("etag", models.CharField(blank=True, default="", max_length=200)),
+                (
+                    "last_modified",
+                    models.CharField(blank=True, default="", max_length=100),
+                ),
+                (
+                    "content_hash",
+                    models.CharField(blank=True, default="", max_length=40),
+                ),
+                ("change_interval", models.IntegerField(default=21600)),
+                ("last_crawled_at", models.DateTimeField(blank=True, null=True)),
+                ("last_changed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "next_crawl_at",
+                    models.DateTimeField(blank=True, db_index=True, null=True),
+                ),
+            ],
+        ),
+    ]
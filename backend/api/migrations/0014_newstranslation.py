@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0013_crawlpage"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NewsTranslation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("lang", models.CharField(max_length=10)),
+                ("title", models.CharField(max_length=500)),
+                ("excerpt", models.TextField(blank=True)),
+                ("source_hash", models.CharField(max_length=40)),
+                ("updated_at", models.DateTimeField(auto_now=True, db_index=True)),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="translations",
+                        to="api.newsitem",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("item", "lang")},
+            },
+        ),
+    ]
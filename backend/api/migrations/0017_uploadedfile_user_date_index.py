@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0016_fileblob"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="uploadedfile",
+            index=models.Index(
+                fields=["user", "-upload_date", "-id"], name="api_file_user_date"
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0017_uploadedfile_user_date_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="uploadedfile",
+            index=models.Index(
+                condition=models.Q(("is_public", True)),
+                fields=["-upload_date", "-id"],
+                name="api_file_public_date",
+            ),
+        ),
+    ]
@@ -10,9 +10,22 @@ def user_directory_path(instance, filename):
     filename = f"{uuid.uuid4()}.{ext}"
     return f'uploads/user_{instance.user.id}/{filename}'
 
+class FileBlob(models.Model):
+    """按内容 SHA-256 寻址的文件实体：相同内容只存一份，引用计数归零时由 blob_store 删除"""
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(max_length=255)
+    size = models.BigIntegerField()
+    ref_count = models.IntegerField(default=0)
+    created_date = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.sha256} ({self.ref_count} refs)"
+
 class UploadedFile(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='uploaded_files')
+    # 新上传的文件指向共享的 blob，file 与 blob.file 同名；旧记录没有 blob，仍是各自独立的文件
     file = models.FileField(upload_to=user_directory_path)
+    blob = models.ForeignKey(FileBlob, on_delete=models.PROTECT, null=True, blank=True, related_name='uploaded_files')
     original_filename = models.CharField(max_length=255)
     file_size = models.BigIntegerField()
     file_type = models.CharField(max_length=100)
@@ -22,6 +35,14 @@ class UploadedFile(models.Model):
     
     class Meta:
         ordering = ['-upload_date']
+        # 文件列表按用户过滤、按 (upload_date, id) 倒序游标分页，单次索引范围扫描
+        indexes = [
+            models.Index(fields=['user', '-upload_date', '-id'], name='api_file_user_date'),
+            # 公开文件列表只扫 is_public 的部分索引，私有文件再多也不影响
+            models.Index(
+                fields=['-upload_date', '-id'], name='api_file_public_date', condition=models.Q(is_public=True)
+            ),
+        ]
     
     def __str__(self):
         return f"{self.original_filename} - {self.user.username}"
@@ -50,4 +71,160 @@ class FileShare(models.Model):
             return True
         if self.max_downloads and self.download_count >= self.max_downloads:
             return True
-        return False 
\ No newline at end of file
+        return False 
+
+class UploadSession(models.Model):
+    """断点续传的上传会话：分块写入预分配的临时文件，全部到齐后生成 UploadedFile"""
+    STATUS_CHOICES = [('uploading', 'Uploading'), ('finalizing', 'Finalizing'), ('done', 'Done')]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    original_filename = models.CharField(max_length=255)
+    file_size = models.BigIntegerField()
+    file_type = models.CharField(max_length=100)
+    chunk_size = models.IntegerField()
+    description = models.TextField(blank=True, null=True)
+    is_public = models.BooleanField(default=False)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading')
+    uploaded_file = models.ForeignKey(UploadedFile, on_delete=models.SET_NULL, null=True, blank=True)
+    created_date = models.DateTimeField(default=timezone.now)
+    expires_date = models.DateTimeField(db_index=True)
+
+    @property
+    def chunk_count(self):
+        return max(1, -(-self.file_size // self.chunk_size))
+
+    def chunk_length(self, index):
+        """Expected byte length of chunk `index`; only the last one may be short"""
+        return min(self.chunk_size, self.file_size - index * self.chunk_size)
+
+    def __str__(self):
+        return f"Upload {self.id} - {self.original_filename}"
+
+class UploadChunk(models.Model):
+    # 每个收齐的分块一行，并发上传不同分块时互不覆盖
+    session = models.ForeignKey(UploadSession, on_delete=models.CASCADE, related_name='chunks')
+    index = models.IntegerField()
+
+    class Meta:
+        unique_together = ['session', 'index']
+
+class NewsItem(models.Model):
+    # 由规范化 URL 哈希得到的稳定 ID，排序变化不会影响它
+    news_id = models.CharField(max_length=16, unique=True)
+    url = models.CharField(max_length=500, unique=True)
+    title = models.CharField(max_length=500)
+    excerpt = models.TextField(blank=True)
+    content = models.TextField(blank=True)
+    category = models.CharField(max_length=50)
+    source = models.CharField(max_length=100)
+    image = models.CharField(max_length=255, default='/globe.svg')
+    published_at = models.DateTimeField(default=timezone.now, db_index=True)
+    # 检索用的文档长度（词数），由 news_search.index_news_item 维护
+    doc_length = models.IntegerField(default=0)
+    # SimHash 指纹及其 4 段 LSH 索引，由 dedup.fingerprint_fields 计算
+    simhash = models.BigIntegerField(null=True, blank=True)
+    simhash_band0 = models.IntegerField(null=True, blank=True, db_index=True)
+    simhash_band1 = models.IntegerField(null=True, blank=True, db_index=True)
+    simhash_band2 = models.IntegerField(null=True, blank=True, db_index=True)
+    simhash_band3 = models.IntegerField(null=True, blank=True, db_index=True)
+    # 近重复条目指向所在簇的代表条目，列表只展示代表条目
+    duplicate_of = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, related_name='duplicates'
+    )
+    alternate_sources = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # 建索引以便快速取最新修改时间，作为新闻快照的版本号
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        ordering = ['-published_at', '-id']
+        # 游标分页按 (published_at, id) 倒序扫描
+        indexes = [models.Index(fields=['-published_at', '-id'], name='api_news_published_id')]
+
+    def __str__(self):
+        return f"{self.title} - {self.source}"
+
+class NewsTranslation(models.Model):
+    """新闻标题/摘要的离线译文，由 news_translate.translate_pending 批量生成"""
+    item = models.ForeignKey(NewsItem, on_delete=models.CASCADE, related_name='translations')
+    lang = models.CharField(max_length=10)
+    title = models.CharField(max_length=500)
+    excerpt = models.TextField(blank=True)
+    # 翻译时原文的哈希，原文改动后据此判断需要重译
+    source_hash = models.CharField(max_length=40)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        unique_together = ['item', 'lang']
+
+    def __str__(self):
+        return f"{self.item_id} [{self.lang}]"
+
+class NewsSource(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+    last_attempt_at = models.DateTimeField(null=True, blank=True)
+    last_success_at = models.DateTimeField(null=True, blank=True)
+    missed_deadline = models.BooleanField(default=False)
+    # 增量抓取游标，例如 arXiv 上次见到的最新 updated 时间
+    cursor = models.CharField(max_length=100, blank=True, default='')
+    # 未完成的分页扫描断点（arXiv 各分类），见 api.arxiv.CategorySweep
+    checkpoint = models.JSONField(default=dict, blank=True)
+    # 熔断器状态与最近调用记录 [时间戳, 耗时毫秒, 是否成功]，由 news_health 维护
+    consecutive_failures = models.IntegerField(default=0)
+    circuit_open_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    recent_calls = models.JSONField(default=list, blank=True)
+
+    def __str__(self):
+        return self.name
+
+class NewsTerm(models.Model):
+    term = models.CharField(max_length=64, unique=True)
+    doc_freq = models.IntegerField(default=0)
+
+    def __str__(self):
+        return self.term
+
+class NewsPosting(models.Model):
+    term = models.CharField(max_length=64)
+    item = models.ForeignKey(NewsItem, on_delete=models.CASCADE, related_name='postings')
+    tf = models.IntegerField()
+
+    class Meta:
+        unique_together = ['term', 'item']
+        # 按词频降序读取倒排表，只取前 N 条
+        indexes = [models.Index(fields=['term', '-tf'], name='api_posting_term_tf')]
+
+class NewsRefreshLease(models.Model):
+    """跨进程的刷新租约：同一时间只有一个进程在跑抓取"""
+    name = models.CharField(max_length=50, unique=True)
+    holder = models.CharField(max_length=100, blank=True, default='')
+    expires_at = models.DateTimeField(null=True, blank=True)
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.name
+
+class CrawlPage(models.Model):
+    """Scrapy 爬虫（crawler/）的抓取记录：条件请求校验值，以及按变化频率调整的重抓时间"""
+    url = models.URLField(max_length=500, unique=True)
+    etag = models.CharField(max_length=200, blank=True, default='')
+    last_modified = models.CharField(max_length=100, blank=True, default='')
+    content_hash = models.CharField(max_length=40, blank=True, default='')
+    # 重抓间隔（秒）：内容变了就减半，没变就翻倍
+    change_interval = models.IntegerField(default=21600)
+    last_crawled_at = models.DateTimeField(null=True, blank=True)
+    last_changed_at = models.DateTimeField(null=True, blank=True)
+    next_crawl_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    def __str__(self):
+        return self.url
+
+class CacheVersion(models.Model):
+    """跨进程共享的缓存版本号：各 worker 的本地缓存以它为键的一部分，数据变化时加一即全部失效"""
+    key = models.CharField(max_length=100, unique=True)
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key} v{self.version}"
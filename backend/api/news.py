@@ -0,0 +1,551 @@
+"""新闻抓取管道：从 arXiv、厂商博客等来源获取新闻并写入 NewsItem 表"""
+import hashlib
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone as dt_timezone
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from bs4 import BeautifulSoup
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from .article_cache import BodyReader, declared_charset, get_article_cache
+from .atom import iter_atom_entries
+from .dedup import attach_duplicates, find_canonicals, fingerprint_fields
+from .extract import extract_text
+from .http_client import conditional_get, http_get, remember_validators
+from .news_health import load_breakers
+from .news_search import BULK_BATCH_SIZE, CORPUS_STATS_KEY, index_news_items
+
+# 来源级和文章级任务分开建池，避免来源任务占满线程后文章抓取排队死锁
+_source_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'NEWS_SOURCE_WORKERS', 8), thread_name_prefix='news-source'
+)
+_article_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'NEWS_ARTICLE_WORKERS', 16), thread_name_prefix='news-article'
+)
+
+# 每个来源最近一次按时完成的结果，超时的来源用它顶上。
+# 只存在当前进程内、尽力而为：进程重启或换一个进程（Web 与 worker 各有一份）就从空开始，
+# 此时超时的来源本轮没有条目，已入库的旧条目不受影响
+_last_good = {}
+
+def get_comprehensive_news(budget=None):
+    """Get news from all sources in parallel under one overall deadline
+
+    Returns (news_items, missed_sources). A source that fails, misses the
+    deadline or has an open circuit breaker is served from its last good
+    result (kept per process, see _last_good) instead of holding up the
+    others. Late tasks are cancelled if they have not started, and every
+    blocking call inside them is bounded by the same deadline, so they
+    cannot hold the shared pools into the next run.
+    """
+    budget = budget or getattr(settings, 'NEWS_FETCH_BUDGET', 20)
+    deadline = time.monotonic() + budget
+    sources = enabled_sources()
+    breakers = load_breakers(list(sources))
+
+    futures = {}
+    missed_sources = []
+    for name, fetch in sources.items():
+        if breakers[name].allow():
+            futures[_source_executor.submit(timed_fetch, fetch, deadline)] = name
+        else:
+            # 熔断打开期间直接跳过，不再等超时
+            missed_sources.append(name)
+    done, late = wait(futures, timeout=budget)
+    for future in late:
+        future.cancel()
+
+    all_news = []
+    for future, name in futures.items():
+        items = None
+        if future in done:
+            items, error, latency = future.result()
+        else:
+            error, latency = 'deadline exceeded', budget
+
+        if error is None:
+            breakers[name].record_success(latency)
+            _last_good[name] = items
+        else:
+            print(f"News source {name} failed: {error}")
+            breakers[name].record_failure(latency, error)
+            missed_sources.append(name)
+            items = _last_good.get(name, [])
+        all_news.extend(items)
+
+    for breaker in breakers.values():
+        breaker.save()
+
+    # Sort by time; everything is persisted, the API decides how much to show
+    all_news.sort(key=lambda x: x.get('timestamp', 0), reverse=True)
+    return all_news, missed_sources
+
+def timed_fetch(fetch, deadline):
+    """Run a source, returning (items, error, latency) instead of raising"""
+    started = time.monotonic()
+    try:
+        return fetch(deadline), None, time.monotonic() - started
+    except Exception as e:
+        return None, e, time.monotonic() - started
+
+def remaining_timeout(deadline, timeout):
+    """Cap a per-request timeout so it never runs past the overall deadline"""
+    if deadline is None:
+        return timeout
+    return max(0.1, min(timeout, deadline - time.monotonic()))
+
+ARXIV_API_URL = 'http://export.arxiv.org/api/query'
+
+def get_arxiv_news(deadline=None):
+    """Get AI papers from the configured arXiv categories updated since the last run
+
+    The crawler stores each page as it goes and checkpoints every category,
+    see api.arxiv. Abstracts come from the same responses, no per-paper
+    lookups are needed. Nothing is returned for ingest_news to store again.
+    """
+    from .arxiv import ArxivCrawler
+
+    ArxivCrawler().crawl(deadline)
+    # 论文已逐页入库；再返回会被 upsert 第二遍，还会留在 _last_good 里占内存
+    return []
+
+def fetch_arxiv_by_ids(paper_ids, deadline=None, batch_size=100):
+    """Re-fetch specific papers with batched id_list queries"""
+    news_items = []
+    ids = [paper_id.rstrip('/').split('/abs/')[-1] for paper_id in paper_ids]
+    # 请求间隔由 http_client 的每主机限速保证
+    for i in range(0, len(ids), batch_size):
+        batch = ids[i:i + batch_size]
+        response = http_get(ARXIV_API_URL, params={
+            'id_list': ','.join(batch),
+            'max_results': len(batch),
+        }, timeout=remaining_timeout(deadline, 15), stream=True)
+        if response.status_code == 200:
+            news_items.extend(parse_arxiv_feed(response))
+        else:
+            response.close()
+    return news_items
+
+def parse_arxiv_feed(source, feed_info=None):
+    """Stream news items out of an arXiv Atom response, bytes or a streamed response"""
+    if hasattr(source, 'raw'):
+        # 让 urllib3 透明解压 gzip，再交给增量解析器
+        source.raw.decode_content = True
+        with source:
+            yield from (arxiv_entry_to_news(entry) for entry in iter_atom_entries(source.raw, feed_info))
+    else:
+        yield from (arxiv_entry_to_news(entry) for entry in iter_atom_entries(source, feed_info))
+
+def arxiv_entry_to_news(entry):
+    """Map a normalized Atom entry to a news item"""
+    summary = re.sub(r'<[^>]+>', '', entry['summary'])
+    published = entry['published']
+    return {
+        "title": entry['title'],
+        "excerpt": summary[:300] + "..." if len(summary) > 300 else summary,
+        "content": summary,
+        "category": "Research",
+        "source": "arXiv",
+        "time": format_time(published),
+        # 去掉版本号，同一篇论文更新后仍对应同一条记录
+        "url": re.sub(r'v\d+$', '', entry['id']),
+        "image": "/globe.svg",
+        "timestamp": parse_timestamp(published),
+        "updated": entry['updated'],
+    }
+
+def get_curated_news(deadline=None):
+    """Curated AI news maintained by the editors"""
+    return [
+        {
+            "title": "OpenAI releases GPT-4o with improved capabilities",
+            "excerpt": "OpenAI has announced the release of GPT-4o, featuring enhanced reasoning abilities and improved performance across multiple benchmarks. The new model demonstrates significant improvements in language understanding, code generation, and mathematical reasoning.",
+            "content": "OpenAI has announced the release of GPT-4o, featuring enhanced reasoning abilities and improved performance across multiple benchmarks. The new model demonstrates significant improvements in language understanding, code generation, and mathematical reasoning. GPT-4o represents a major step forward in AI capabilities, with better performance on complex tasks and improved safety measures. The model has been trained on a diverse dataset and includes advanced techniques for reducing harmful outputs while maintaining high performance across various domains.",
+            "category": "Breaking",
+            "source": "OpenAI Blog",
+            "time": "1 hour ago",
+            "url": "https://openai.com/blog/gpt-4o",
+            "image": "/globe.svg",
+            "timestamp": timezone.now().timestamp() - 3600
+        },
+        {
+            "title": "Google DeepMind achieves breakthrough in protein folding",
+            "excerpt": "AlphaFold 3 demonstrates unprecedented accuracy in predicting protein structures, advancing drug discovery and biotechnology. The new model can predict protein structures with atomic-level accuracy.",
+            "content": "AlphaFold 3 demonstrates unprecedented accuracy in predicting protein structures, advancing drug discovery and biotechnology. The new model can predict protein structures with atomic-level accuracy, which is crucial for understanding disease mechanisms and developing new therapeutics. This breakthrough has the potential to accelerate drug discovery by years and reduce costs significantly. The model uses advanced deep learning techniques and has been validated against experimental data.",
+            "category": "Research",
+            "source": "Nature",
+            "time": "3 hours ago",
+            "url": "https://www.nature.com/articles/s41586-024-07487-w",
+            "image": "/globe.svg",
+            "timestamp": timezone.now().timestamp() - 10800
+        },
+        {
+            "title": "Microsoft announces new AI-powered coding assistant",
+            "excerpt": "Microsoft has unveiled a new AI-powered coding assistant that integrates with Visual Studio Code and other development environments. The tool provides intelligent code completion, bug detection, and automated refactoring.",
+            "content": "Microsoft has unveiled a new AI-powered coding assistant that integrates with Visual Studio Code and other development environments. The tool provides intelligent code completion, bug detection, and automated refactoring. This development represents a significant advancement in AI-assisted programming, potentially increasing developer productivity by up to 50%. The assistant uses large language models trained on millions of lines of code and can understand context across entire codebases.",
+            "category": "Industry",
+            "source": "Microsoft Blog",
+            "time": "5 hours ago",
+            "url": "https://blogs.microsoft.com/ai-coding-assistant",
+            "image": "/globe.svg",
+            "timestamp": timezone.now().timestamp() - 18000
+        }
+    ]
+
+def scrape_openai_blog(deadline=None):
+    """Scrape OpenAI blog for latest news"""
+    return scrape_blog(
+        'https://openai.com/blog', 'https://openai.com', 'Breaking', 'OpenAI Blog', deadline
+    )
+
+def scrape_google_ai_blog(deadline=None):
+    """Scrape Google AI blog for latest news"""
+    return scrape_blog(
+        'https://ai.googleblog.com/', '', 'Research', 'Google AI Blog', deadline
+    )
+
+def scrape_blog(listing_url, url_prefix, category, source, deadline=None):
+    """Scrape a blog listing page, fetching the article bodies in parallel
+
+    Network and HTTP errors propagate so the source's circuit breaker sees them.
+    """
+    response = conditional_get(listing_url, timeout=remaining_timeout(deadline, 10), remember=False)
+    # 304 表示列表页没有变化，本轮不用重新解析
+    if response.status_code == 304:
+        return []
+    response.raise_for_status()
+
+    soup = BeautifulSoup(response.content, 'html.parser')
+    articles = soup.find_all('article', limit=5)
+
+    entries = []
+    for article in articles:
+        title_elem = article.find('h2') or article.find('h3')
+        if title_elem:
+            title = title_elem.get_text().strip()
+            link = article.find('a')
+            url = f"{url_prefix}{link['href']}" if link and link.get('href') else ""
+            entries.append((title, url))
+
+    # Get article content
+    contents = fetch_article_contents([url for _, url in entries if url], deadline)
+
+    news_items = []
+    for title, url in entries:
+        # None 表示抓取失败或没赶上截止时间，入库时保留已有正文
+        content = contents.get(url)
+        excerpt = None if content is None else (content[:300] + "..." if len(content) > 300 else content)
+        news_items.append({
+            "title": title,
+            "excerpt": excerpt,
+            "content": content,
+            "category": category,
+            "source": source,
+            "time": "Recently",
+            "url": url,
+            "image": "/globe.svg",
+            "timestamp": timezone.now().timestamp()
+        })
+
+    # 所有正文都拿到后才记住列表页的校验值；否则下一轮会因 304 跳过，缺的正文再也补不回来
+    if all(contents.get(url) is not None for _, url in entries if url):
+        remember_validators(listing_url, response)
+    return news_items
+
+def fetch_article_contents(urls, deadline=None):
+    """Fetch article bodies in parallel, returns {url: text or None} for those done in time"""
+    futures = {_article_executor.submit(get_article_content, url, deadline): url for url in urls}
+    timeout = None if deadline is None else max(0, deadline - time.monotonic())
+    done, late = wait(futures, timeout=timeout)
+    # 还在排队的直接取消；已经开始的受同一截止时间约束，很快会自己结束
+    for future in late:
+        future.cancel()
+    return {futures[future]: future.result() for future in done}
+
+def get_article_content(url, deadline=None):
+    """Get full article content from URL through the on-disk article cache
+
+    Fresh entries are served without any request; stale ones are revalidated
+    and only re-extracted when the HTML actually changed. Returns None when
+    the article could not be fetched, so the stored content is kept.
+    """
+    if deadline is not None and time.monotonic() >= deadline:
+        # 排到时已经超过截止时间，没人等这个结果了
+        return None
+    cache = get_article_cache()
+    key = canonical_url(url)
+    entry = cache.get(key)
+    if entry is not None and entry.is_fresh(cache.ttl):
+        cache.count('hits')
+        cache.touch(entry)
+        return entry.text
+
+    try:
+        headers = entry.validators() if entry is not None else {}
+        response = http_get(url, timeout=remaining_timeout(deadline, 10), headers=headers, stream=True)
+        if response.status_code == 304 and entry is not None:
+            response.close()
+            cache.count('revalidated')
+            cache.touch(entry, refetched=True)
+            return entry.text
+        if response.status_code == 200:
+            encoding = declared_charset(response)
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            # 边下载边抽取，正文够长就断开，页面剩下的部分不再下载；读到的前缀存进缓存
+            reader = BodyReader(response, deadline=deadline)
+            try:
+                text = extract_text(reader, max_chars=2000, encoding=encoding)  # Limit content length
+            finally:
+                reader.close()
+            html = reader.body
+            # 服务器不支持条件请求时，读到的内容没变就不重写缓存
+            if entry is not None and hashlib.sha1(html).hexdigest() == entry.html_hash:
+                cache.count('unchanged')
+                cache.touch(entry, refetched=True)
+                return entry.text
+            cache.count('misses')
+            cache.put(key, html, text, etag, last_modified, encoding, truncated=not reader.complete)
+            return text
+        response.close()
+    except Exception as e:
+        print(f"Error fetching article {url}: {e}")
+    return None
+
+def get_research_news(deadline=None):
+    """Get research news from various sources"""
+    return [
+        {
+            "title": "Breakthrough in quantum machine learning algorithms",
+            "excerpt": "Researchers have developed new quantum machine learning algorithms that could revolutionize AI processing. The algorithms leverage quantum computing principles to solve complex optimization problems.",
+            "content": "Researchers have developed new quantum machine learning algorithms that could revolutionize AI processing. The algorithms leverage quantum computing principles to solve complex optimization problems that are currently intractable for classical computers. This breakthrough could lead to significant advances in drug discovery, materials science, and financial modeling. The research team demonstrated that their quantum algorithms can achieve exponential speedup for certain types of machine learning tasks.",
+            "category": "Research",
+            "source": "Science",
+            "time": "1 day ago",
+            "url": "https://science.org/quantum-ml-breakthrough",
+            "image": "/globe.svg",
+            "timestamp": timezone.now().timestamp() - 86400
+        }
+    ]
+
+NEWS_SOURCES = {
+    'arXiv': get_arxiv_news,
+    'OpenAI Blog': scrape_openai_blog,
+    'Google AI Blog': scrape_google_ai_blog,
+    'Curated': get_curated_news,
+    'Research': get_research_news,
+}
+
+def enabled_sources():
+    """NEWS_SOURCES minus those handed over to the Scrapy crawler (NEWS_DISABLED_SOURCES)"""
+    disabled = set(getattr(settings, 'NEWS_DISABLED_SOURCES', []))
+    return {name: fetch for name, fetch in NEWS_SOURCES.items() if name not in disabled}
+
+def get_fallback_news():
+    """Fallback news when all sources fail"""
+    return [
+        {
+            "title": "AI Development Continues Rapid Pace",
+            "excerpt": "Recent developments in artificial intelligence show continued progress across multiple domains including language models, computer vision, and robotics. The field is advancing at an unprecedented rate.",
+            "content": "Recent developments in artificial intelligence show continued progress across multiple domains including language models, computer vision, and robotics. The field is advancing at an unprecedented rate, with new breakthroughs being announced regularly. Researchers and companies worldwide are pushing the boundaries of what's possible with AI, leading to innovations that could transform industries and society.",
+            "category": "Industry",
+            "source": "AI Research",
+            "time": "2 hours ago",
+            "url": "#",
+            "image": "/globe.svg",
+            "timestamp": timezone.now().timestamp() - 7200
+        }
+    ]
+
+def format_time(published_str):
+    """Format time display"""
+    try:
+        dt = datetime.fromisoformat(published_str.replace('Z', '+00:00'))
+        return format_age(dt.replace(tzinfo=timezone.utc))
+    except:
+        return "Recently"
+
+def format_age(dt):
+    """Format a datetime as a relative age string"""
+    diff = timezone.now() - dt
+
+    if diff.days > 0:
+        return f"{diff.days} days ago"
+    elif diff.seconds > 3600:
+        hours = diff.seconds // 3600
+        return f"{hours} hours ago"
+    else:
+        minutes = diff.seconds // 60
+        return f"{minutes} minutes ago"
+
+def parse_timestamp(published_str):
+    """Parse timestamp for sorting"""
+    try:
+        dt = datetime.fromisoformat(published_str.replace('Z', '+00:00'))
+        return dt.replace(tzinfo=timezone.utc).timestamp()
+    except:
+        return timezone.now().timestamp()
+
+def canonical_url(url):
+    """Normalize a URL so trivially different links map to the same article"""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    # 去掉 utm_* 等跟踪参数，保留其余参数的稳定顺序
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_')
+    ))
+    path = parts.path.rstrip('/') or '/'
+    # http/https 视为同一篇文章
+    return urlunsplit(('https', host, path, query, ''))
+
+def news_id_for_url(url):
+    """Stable content-derived ID for a news item"""
+    return hashlib.sha1(canonical_url(url).encode('utf-8')).hexdigest()[:16]
+
+def upsert_news_items(news_items):
+    """Insert or update a batch of news items keyed by their stable ID
+
+    Existing rows are read in one query, new rows are written with
+    bulk_create and changed ones with bulk_update; duplicate lookup and the
+    search index run once for the whole batch. New items that are
+    near-duplicates of a stored story, or of an earlier item in the batch,
+    join its cluster. Returns (created, updated, duplicates).
+    """
+    from .models import NewsItem
+
+    pending = {}
+    for item in news_items:
+        url = item.get('url')
+        if not url:
+            continue
+
+        fields = {
+            'title': item.get('title', '')[:500],
+            'excerpt': item.get('excerpt'),
+            'content': item.get('content'),
+            'category': item.get('category', ''),
+            'source': item.get('source', ''),
+            'image': item.get('image', '/globe.svg'),
+        }
+        # 值为 None 的字段表示“沿用已有内容”
+        fields = {name: value for name, value in fields.items() if value is not None}
+
+        news_id = news_id_for_url(url)
+        if news_id in pending:
+            # 同一批里出现两次的文章：链接和时间取第一次的，字段按顺序覆盖
+            pending[news_id][2].update(fields)
+        else:
+            pending[news_id] = (url, item.get('timestamp'), fields)
+
+    if not pending:
+        return 0, 0, 0
+
+    with transaction.atomic():
+        existing = NewsItem.objects.in_bulk(list(pending), field_name='news_id')
+
+        new_items, changed_items, changed_fields = [], [], set()
+        now = timezone.now()
+        for news_id, (url, timestamp, fields) in pending.items():
+            row = existing.get(news_id)
+            if row is None:
+                published_at = datetime.fromtimestamp(timestamp or now.timestamp(), tz=dt_timezone.utc)
+                fingerprint = fingerprint_fields(
+                    fields.get('title', ''), fields.get('excerpt') or '', fields.get('content') or ''
+                )
+                new_items.append(NewsItem(
+                    news_id=news_id, url=url, published_at=published_at, **fingerprint, **fields
+                ))
+                continue
+
+            diff = {name: value for name, value in fields.items() if getattr(row, name) != value}
+            if diff:
+                # 已有条目保留首次发布时间，避免每次抓取都被顶到列表最前
+                for name, value in diff.items():
+                    setattr(row, name, value)
+                row.updated_at = now
+                changed_fields.update(diff)
+                changed_items.append(row)
+
+        if changed_items:
+            # bulk_update 不经过 auto_now，updated_at 上面已手动设置
+            NewsItem.objects.bulk_update(
+                changed_items, [*changed_fields, 'updated_at'], batch_size=BULK_BATCH_SIZE
+            )
+
+        # 先写入各簇的代表条目拿到主键，再写指向它们的重复条目
+        canonicals = find_canonicals(new_items)
+        duplicate_pairs = [
+            (canonical, item) for item, canonical in zip(new_items, canonicals) if canonical is not None
+        ]
+        NewsItem.objects.bulk_create(
+            [item for item, canonical in zip(new_items, canonicals) if canonical is None],
+            batch_size=BULK_BATCH_SIZE,
+        )
+        for canonical, item in duplicate_pairs:
+            item.duplicate_of = canonical
+        NewsItem.objects.bulk_create([item for _, item in duplicate_pairs], batch_size=BULK_BATCH_SIZE)
+        attach_duplicates(duplicate_pairs)
+
+        index_news_items(new_items + changed_items, fresh=new_items)
+
+    if new_items or changed_items:
+        cache.delete(CORPUS_STATS_KEY)
+    return len(new_items), len(changed_items), len(duplicate_pairs)
+
+def news_version():
+    """Version of the current news snapshot: the latest change to items or source status"""
+    from .models import NewsItem, NewsSource, NewsTranslation
+
+    stamps = [
+        NewsItem.objects.order_by('-updated_at').values_list('updated_at', flat=True).first(),
+        NewsSource.objects.order_by('-last_attempt_at').values_list('last_attempt_at', flat=True).first(),
+        # 译文单独入库，?lang= 的列表也要随之失效
+        NewsTranslation.objects.order_by('-updated_at').values_list('updated_at', flat=True).first(),
+    ]
+    stamps = [stamp for stamp in stamps if stamp is not None]
+    return max(stamps) if stamps else None
+
+def record_source_status(missed_sources):
+    """Remember which sources made the deadline on the last run"""
+    from .models import NewsSource
+
+    now = timezone.now()
+    for name in enabled_sources():
+        defaults = {'last_attempt_at': now, 'missed_deadline': name in missed_sources}
+        if name not in missed_sources:
+            defaults['last_success_at'] = now
+        NewsSource.objects.update_or_create(name=name, defaults=defaults)
+
+def ingest_news():
+    """Run the full fetch pipeline once and persist the results"""
+    cache_before = get_article_cache().snapshot()
+    news_items, missed_sources = get_comprehensive_news()
+    created, updated, duplicates = upsert_news_items(news_items)
+    record_source_status(missed_sources)
+    from .news_snapshot import publish_snapshot
+    snapshot_version = publish_snapshot()
+    # 新条目入库后顺带翻译，失败不影响本轮抓取结果
+    from .news_translate import translate_pending, translation_languages
+    translated = {}
+    for lang in translation_languages():
+        try:
+            translated[lang] = translate_pending(lang)
+        except Exception as e:
+            print(f"News translation failed ({lang}): {e}")
+    cache_after = get_article_cache().snapshot()
+    return {
+        'fetched': len(news_items),
+        'created': created,
+        'updated': updated,
+        'duplicates': duplicates,
+        'missed_sources': missed_sources,
+        'snapshot_version': snapshot_version,
+        'translated': translated,
+        'article_cache': {name: cache_after[name] - cache_before[name] for name in cache_after},
+    }
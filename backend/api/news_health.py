@@ -0,0 +1,93 @@
+"""新闻来源的熔断器与健康统计：故障来源直接跳过，不再每次都等满超时"""
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+
+# 最近多少次调用参与滚动统计
+STATS_WINDOW = 50
+
+class CircuitBreaker:
+    """Per-source breaker: closed -> open after N failures -> half-open probe after cooldown
+
+    State is loaded from NewsSource once per ingestion run, so checking an
+    open breaker is an in-memory comparison.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.threshold = getattr(settings, 'NEWS_BREAKER_FAILURES', 3)
+        self.cooldown = getattr(settings, 'NEWS_BREAKER_COOLDOWN', 300)
+        self.max_cooldown = getattr(settings, 'NEWS_BREAKER_MAX_COOLDOWN', 3600)
+
+    @property
+    def state(self):
+        open_until = self.source.circuit_open_until
+        if open_until is None:
+            return 'closed'
+        return 'open' if timezone.now() < open_until else 'half_open'
+
+    def allow(self):
+        """False while open; a half-open breaker lets one probe through"""
+        return self.state != 'open'
+
+    def record_success(self, latency):
+        self.source.consecutive_failures = 0
+        self.source.circuit_open_until = None
+        self.source.last_error = ''
+        self._record_call(latency, True)
+
+    def record_failure(self, latency, error):
+        was_half_open = self.state == 'half_open'
+        self.source.consecutive_failures += 1
+        self.source.last_error = str(error)[:500]
+        failures = self.source.consecutive_failures
+        if was_half_open or failures >= self.threshold:
+            # 半开探测失败或连续失败达到阈值：打开熔断，冷却时间随失败次数翻倍
+            cooldown = min(self.cooldown * 2 ** max(0, failures - self.threshold), self.max_cooldown)
+            self.source.circuit_open_until = timezone.now() + timedelta(seconds=cooldown)
+        self._record_call(latency, False)
+
+    def _record_call(self, latency, ok):
+        calls = list(self.source.recent_calls or [])
+        calls.append([round(timezone.now().timestamp()), round(latency * 1000), ok])
+        self.source.recent_calls = calls[-STATS_WINDOW:]
+
+    def save(self):
+        self.source.save(update_fields=[
+            'consecutive_failures', 'circuit_open_until', 'last_error', 'recent_calls'
+        ])
+
+def load_breakers(names):
+    """One breaker per source name, creating NewsSource rows as needed"""
+    from .models import NewsSource
+
+    sources = {source.name: source for source in NewsSource.objects.filter(name__in=list(names))}
+    for name in names:
+        if name not in sources:
+            sources[name], _ = NewsSource.objects.get_or_create(name=name)
+    return {name: CircuitBreaker(sources[name]) for name in names}
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def source_health(source):
+    """Rolling latency/error stats for the internal health endpoint"""
+    calls = source.recent_calls or []
+    latencies = [latency for _, latency, _ in calls]
+    errors = sum(1 for _, _, ok in calls if not ok)
+    return {
+        'name': source.name,
+        'state': CircuitBreaker(source).state,
+        'consecutive_failures': source.consecutive_failures,
+        'circuit_open_until': source.circuit_open_until.isoformat() if source.circuit_open_until else None,
+        'last_error': source.last_error,
+        'last_success_at': source.last_success_at.isoformat() if source.last_success_at else None,
+        'missed_deadline': source.missed_deadline,
+        'calls': len(calls),
+        'error_rate': round(errors / len(calls), 3) if calls else None,
+        'latency_p50_ms': _percentile(latencies, 0.5),
+        'latency_p95_ms': _percentile(latencies, 0.95),
+    }
@@ -0,0 +1,112 @@
+"""新闻快照的 stale-while-revalidate 刷新：请求立即读旧快照，后台只跑一个刷新任务"""
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from .news import ingest_news
+
+LEASE_NAME = 'news'
+
+# 进程内的单飞控制：同一进程里最多一个刷新线程
+_refresh_lock = threading.Lock()
+_refresh_running = False
+# 每个进程最多每隔这么多秒查一次快照是否过期，避免每个请求都查库
+_next_check = 0.0
+STALE_CHECK_INTERVAL = 30
+
+def lease_holder_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+def acquire_lease(holder, ttl):
+    """Atomically take the refresh lease if it is free or has expired"""
+    from .models import NewsRefreshLease
+
+    NewsRefreshLease.objects.get_or_create(name=LEASE_NAME)
+    now = timezone.now()
+    # 条件 UPDATE 在数据库层面是原子的，多个 gunicorn worker 同时抢也只有一个成功
+    taken = NewsRefreshLease.objects.filter(name=LEASE_NAME).filter(
+        Q(expires_at__isnull=True) | Q(expires_at__lt=now)
+    ).update(holder=holder, expires_at=now + timedelta(seconds=ttl))
+    return taken == 1
+
+def renew_lease(holder, ttl):
+    """Extend a lease this holder still owns, for long runs such as backfills"""
+    from .models import NewsRefreshLease
+
+    renewed = NewsRefreshLease.objects.filter(name=LEASE_NAME, holder=holder).update(
+        expires_at=timezone.now() + timedelta(seconds=ttl)
+    )
+    return renewed == 1
+
+def release_lease(holder, refreshed):
+    from .models import NewsRefreshLease
+
+    fields = {'expires_at': None, 'holder': ''}
+    if refreshed:
+        fields['refreshed_at'] = timezone.now()
+    NewsRefreshLease.objects.filter(name=LEASE_NAME, holder=holder).update(**fields)
+
+def refresh_news():
+    """Run one ingestion if no other process is already doing it
+
+    Returns the ingestion stats, or None when another holder has the lease.
+    """
+    holder = lease_holder_id()
+    if not acquire_lease(holder, getattr(settings, 'NEWS_REFRESH_LEASE_SECONDS', 300)):
+        return None
+    refreshed = False
+    try:
+        stats = ingest_news()
+        refreshed = True
+        return stats
+    finally:
+        release_lease(holder, refreshed)
+
+def is_stale():
+    from .models import NewsRefreshLease
+
+    refreshed_at = NewsRefreshLease.objects.filter(name=LEASE_NAME).values_list(
+        'refreshed_at', flat=True
+    ).first()
+    interval = getattr(settings, 'NEWS_INGEST_INTERVAL', 1800)
+    return refreshed_at is None or timezone.now() - refreshed_at > timedelta(seconds=interval)
+
+def _refresh_in_thread():
+    global _refresh_running
+    try:
+        refresh_news()
+    except Exception as e:
+        print(f"Background news refresh failed: {e}")
+    finally:
+        # 后台线程有自己的数据库连接，用完要关掉
+        connection.close()
+        with _refresh_lock:
+            _refresh_running = False
+
+def maybe_refresh_in_background():
+    """Kick off a background refresh when the snapshot is stale, never blocks the request"""
+    global _next_check, _refresh_running
+    if not getattr(settings, 'NEWS_REFRESH_ON_REQUEST', True):
+        return False
+
+    now = time.monotonic()
+    with _refresh_lock:
+        if _refresh_running or now < _next_check:
+            return False
+        _next_check = now + STALE_CHECK_INTERVAL
+
+    if not is_stale():
+        return False
+
+    with _refresh_lock:
+        if _refresh_running:
+            return False
+        _refresh_running = True
+    threading.Thread(target=_refresh_in_thread, name='news-refresh', daemon=True).start()
+    return True
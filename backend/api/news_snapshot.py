@@ -0,0 +1,220 @@
+"""预编码的新闻列表快照：写出不可变文件，同一台机器上的各 worker 用 mmap 共享并直接返回字节
+
+快照目录只在本机共享。抓取任务发布后，同机的 worker 立即切换；Web 进程还会定期
+对比数据库的 news_version，落后时在本机重新发布一次，所以 worker 跑在别的容器里也没关系。
+"""
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+from .models import NewsItem, NewsSource
+from .news import format_age, news_version
+from .pagination import decode_cursor, encode_cursor
+from .serializers import NEWS_LIST_FIELDS, NewsItemSerializer
+
+# 文件格式：MAGIC + 索引长度 + 索引 JSON + 数据区
+# 数据区是逗号分隔的各条目 JSON；相对时间 time 会过时，不预编码，读取时再拼到每条前面
+MAGIC = b'AIRNEWS2'
+HEADER = struct.Struct('>8sQ')
+STAMP_NAME = 'CURRENT'
+ENCODED_FIELDS = [name for name in NEWS_LIST_FIELDS if name != 'time']
+
+# worker 最多每隔这么多秒看一次版本戳
+CHECK_INTERVAL = 1.0
+
+_renderer = JSONRenderer()
+
+def snapshot_dir():
+    cache_dir = getattr(settings, 'NEWS_HTTP_CACHE_DIR', os.path.join(settings.BASE_DIR, 'news_cache'))
+    return getattr(settings, 'NEWS_SNAPSHOT_DIR', os.path.join(cache_dir, 'snapshot'))
+
+def render_page(news, total_count, next_cursor, last_updated, missed_sources):
+    """Response body for NewsListView, with `news` already encoded as comma-joined items"""
+    tail = _renderer.render({
+        "total_count": total_count,
+        "next_cursor": next_cursor,
+        "last_updated": last_updated,
+        "missed_sources": missed_sources,
+    })
+    return b'{"news":[' + news + b'],' + tail[1:]
+
+def publish_snapshot():
+    """Encode the newest list page(s) once and atomically publish them
+
+    Returns the new version stamp, or None when there is nothing to publish.
+    """
+    # 先取数据库版本再读条目：期间有新写入时记下的版本偏旧，下次检查会再发布
+    source_version = news_version()
+    size = getattr(settings, 'NEWS_SNAPSHOT_SIZE', 200)
+    default_limit = getattr(settings, 'NEWS_SNAPSHOT_DEFAULT_LIMIT', 50)
+    items = list(
+        NewsItem.objects.filter(duplicate_of__isnull=True)
+        .order_by('-published_at', '-id')
+        .only('id', 'published_at', 'updated_at', *NewsItemSerializer.model_fields(NEWS_LIST_FIELDS))[:size + 1]
+    )
+    if not items:
+        return None
+    has_more = len(items) > size
+    items = items[:size]
+    missed_sources = list(NewsSource.objects.filter(missed_deadline=True).values_list('name', flat=True))
+
+    data = bytearray()
+    index_items = []
+    for item, encoded in zip(items, NewsItemSerializer(items, many=True, fields=ENCODED_FIELDS).data):
+        if data:
+            data += b','
+        start = len(data)
+        data += _renderer.render(encoded)
+        index_items.append([item.pk, item.published_at.isoformat(), item.updated_at.isoformat(), start, len(data)])
+
+    version = f"{int(time.time() * 1000)}"
+    index = json.dumps({
+        'version': version,
+        'source_version': source_version.isoformat() if source_version else None,
+        'items': index_items,
+        'has_more': has_more,
+        'default_limit': default_limit,
+        'missed_sources': missed_sources,
+    }).encode('utf-8')
+
+    directory = snapshot_dir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'news-{version}.snap')
+    # 快照文件写好后不再修改，版本戳最后替换，worker 不会读到半个快照
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(index)))
+        f.write(index)
+        f.write(data)
+    os.replace(tmp_path, path)
+    stamp_path = os.path.join(directory, STAMP_NAME)
+    with open(f'{stamp_path}.tmp', 'w') as f:
+        f.write(version)
+    os.replace(f'{stamp_path}.tmp', stamp_path)
+
+    # 保留上一个版本给还没切换的 worker，更早的删掉（已 mmap 的进程不受影响）
+    for old in sorted(glob.glob(os.path.join(directory, 'news-*.snap')))[:-2]:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+    return version
+
+class NewsSnapshot:
+    """A published snapshot, memory-mapped read-only
+
+    The encoded items stay in the shared page cache; each process only keeps
+    the small offset index. Only the relative `time` of each item is
+    rendered per request.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_len = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f'Not a news snapshot: {path}')
+        index = json.loads(self.mm[HEADER.size:HEADER.size + index_len])
+        base = HEADER.size + index_len
+        self.version = index['version']
+        self.items = [(pk, published, updated, base + start, base + end) for pk, published, updated, start, end in index['items']]
+        self.published = [datetime.fromisoformat(entry[1]) for entry in self.items]
+        self.positions = {entry[0]: i for i, entry in enumerate(self.items)}
+        self.has_more = index['has_more']
+        self.default_limit = index['default_limit']
+        self.missed_sources = index['missed_sources']
+        source_version = index.get('source_version')
+        self.source_version = datetime.fromisoformat(source_version) if source_version else None
+
+    def encode_items(self, start, stop):
+        """Comma-joined item JSON for positions [start, stop), with a fresh `time`"""
+        return b','.join(
+            b'{"time":' + _renderer.render(format_age(self.published[i])) + b',' + self.mm[entry[3] + 1:entry[4]]
+            for i, entry in enumerate(self.items[start:stop], start)
+        )
+
+    def page(self, cursor=None, limit=None):
+        """Encoded response body for a list page, or None if it lies outside the snapshot"""
+        limit = limit or self.default_limit
+        start = 0
+        if cursor:
+            try:
+                published, pk = decode_cursor(cursor)
+            except ValueError:
+                return None
+            position = self.positions.get(pk)
+            if position is None or self.items[position][1] != published.isoformat():
+                return None
+            start = position + 1
+        rows = self.items[start:start + limit]
+        # 快照之外的部分交给数据库查询
+        if not rows or (len(rows) < limit and self.has_more):
+            return None
+
+        next_cursor = None
+        if start + limit < len(self.items) or self.has_more:
+            last = rows[-1]
+            next_cursor = encode_cursor(datetime.fromisoformat(last[1]), last[0])
+        return render_page(
+            self.encode_items(start, start + len(rows)), len(rows), next_cursor,
+            max(row[2] for row in rows), self.missed_sources,
+        )
+
+_snapshot = None
+_checked_at = 0.0
+_synced_at = 0.0
+_snapshot_lock = threading.Lock()
+
+def current_snapshot():
+    """The newest published snapshot, re-checking the version stamp at most once a second
+
+    Every NEWS_SNAPSHOT_SYNC_INTERVAL seconds the snapshot is also compared
+    with the database and republished on this host when it is behind.
+    """
+    global _snapshot, _checked_at, _synced_at
+    now = time.monotonic()
+    if now - _checked_at < CHECK_INTERVAL:
+        return _snapshot
+    with _snapshot_lock:
+        if now - _checked_at < CHECK_INTERVAL:
+            return _snapshot
+        _checked_at = now
+        if now - _synced_at >= getattr(settings, 'NEWS_SNAPSHOT_SYNC_INTERVAL', 30):
+            _synced_at = now
+            sync_snapshot()
+        load_current()
+    return _snapshot
+
+def sync_snapshot():
+    """Republish locally when the database has changed since the snapshot on disk was built"""
+    version = news_version()
+    if version is None:
+        return
+    load_current()
+    if _snapshot is None or _snapshot.source_version is None or _snapshot.source_version < version:
+        try:
+            publish_snapshot()
+        except OSError as e:
+            print(f"Failed to publish news snapshot: {e}")
+
+def load_current():
+    """Switch to the version named by the stamp file if it changed"""
+    global _snapshot
+    directory = snapshot_dir()
+    try:
+        with open(os.path.join(directory, STAMP_NAME)) as f:
+            version = f.read().strip()
+    except OSError:
+        return
+    if version and (_snapshot is None or _snapshot.version != version):
+        try:
+            # 旧快照不主动关闭，正在使用它的请求结束后由垃圾回收释放
+            _snapshot = NewsSnapshot(os.path.join(directory, f'news-{version}.snap'))
+        except (OSError, ValueError) as e:
+            print(f"Failed to load news snapshot {version}: {e}")
@@ -0,0 +1,110 @@
+"""新闻推送（SSE）：每个进程一个轮询任务查新条目，再分发给所有连接，空闲连接只占一个协程"""
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from .models import NewsItem
+from .serializers import NEWS_LIST_FIELDS, NewsItemSerializer
+
+# 断线重连时最多补发多少条
+BACKLOG_LIMIT = 100
+# 每个连接排队未发出的批次上限，客户端太慢就丢弃最旧的
+QUEUE_SIZE = 20
+
+def latest_news_pk():
+    return NewsItem.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+def news_since(last_pk, limit=BACKLOG_LIMIT):
+    """Representative items stored after last_pk, oldest first, as (pk, data) pairs"""
+    items = list(
+        NewsItem.objects.filter(id__gt=last_pk, duplicate_of__isnull=True)
+        .order_by('id')
+        .only('id', 'published_at', *NewsItemSerializer.model_fields(NEWS_LIST_FIELDS))[:limit]
+    )
+    data = NewsItemSerializer(items, many=True, fields=NEWS_LIST_FIELDS).data
+    return [(item.pk, entry) for item, entry in zip(items, data)]
+
+class NewsBroadcaster:
+    """Polls the store once per interval on behalf of every open stream
+
+    The polling task only runs while at least one client is subscribed.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.subscribers = set()
+        self.last_pk = None
+        self.task = None
+
+    async def subscribe(self):
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.subscribers.add(queue)
+        if self.last_pk is None:
+            self.last_pk = await sync_to_async(latest_news_pk)()
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    async def run(self):
+        while self.subscribers:
+            await asyncio.sleep(self.interval)
+            try:
+                batch = await sync_to_async(news_since)(self.last_pk)
+            except Exception as e:
+                print(f"News stream poll failed: {e}")
+                continue
+            if not batch:
+                continue
+            self.last_pk = batch[-1][0]
+            for queue in list(self.subscribers):
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(batch)
+        self.last_pk = None
+
+_broadcaster = None
+
+def get_broadcaster():
+    global _broadcaster
+    if _broadcaster is None:
+        _broadcaster = NewsBroadcaster(getattr(settings, 'NEWS_STREAM_POLL_INTERVAL', 5))
+    return _broadcaster
+
+def format_event(pk, data):
+    return f"id: {pk}\nevent: news\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def news_events(last_event_id=None):
+    """Async SSE body: replay anything after Last-Event-ID, then push new items
+
+    Ends after NEWS_STREAM_MAX_SECONDS so a connection the server failed to
+    notice closing cannot live forever; EventSource reconnects by itself and
+    resumes from the last id it saw.
+    """
+    broadcaster = get_broadcaster()
+    queue = await broadcaster.subscribe()
+    heartbeat = getattr(settings, 'NEWS_STREAM_HEARTBEAT', 15)
+    loop = asyncio.get_running_loop()
+    closes_at = loop.time() + getattr(settings, 'NEWS_STREAM_MAX_SECONDS', 300)
+    try:
+        yield "retry: 5000\n\n"
+        last_pk = broadcaster.last_pk
+        if last_event_id is not None:
+            for pk, data in await sync_to_async(news_since)(last_event_id):
+                yield format_event(pk, data)
+                last_pk = pk
+        while loop.time() < closes_at:
+            try:
+                batch = await asyncio.wait_for(queue.get(), timeout=min(heartbeat, closes_at - loop.time()))
+            except asyncio.TimeoutError:
+                # 注释行让代理和浏览器知道连接还活着
+                yield ": keep-alive\n\n"
+                continue
+            for pk, data in batch:
+                if pk > last_pk:
+                    yield format_event(pk, data)
+                    last_pk = pk
+    finally:
+        broadcaster.unsubscribe(queue)
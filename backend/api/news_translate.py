@@ -0,0 +1,133 @@
+"""新闻标题/摘要的离线批量翻译：入库后一次性译好存表，列表/详情接口按 ?lang= 直接返回译文"""
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from .models import NewsItem, NewsTranslation
+
+LANGUAGE_NAMES = {'zh': '简体中文', 'en': 'English', 'ja': '日本語'}
+
+def translation_languages():
+    return getattr(settings, 'NEWS_TRANSLATION_LANGUAGES', ['zh'])
+
+def source_hash(title, excerpt):
+    return hashlib.sha1(f"{title}\n{excerpt or ''}".encode('utf-8')).hexdigest()
+
+def pending_items(lang, window):
+    """Newest representative items whose translation is missing or out of date"""
+    items = list(
+        NewsItem.objects.filter(duplicate_of__isnull=True)
+        .order_by('-published_at', '-id')
+        .only('id', 'title', 'excerpt')[:window]
+    )
+    done = dict(
+        NewsTranslation.objects.filter(lang=lang, item__in=items).values_list('item_id', 'source_hash')
+    )
+    return [item for item in items if done.get(item.pk) != source_hash(item.title, item.excerpt)]
+
+def make_batches(items, max_items, max_chars):
+    """Group items so each LLM call stays under both an item and a character budget"""
+    batch, size = [], 0
+    for item in items:
+        length = len(item.title) + len(item.excerpt or '')
+        if batch and (len(batch) >= max_items or size + length > max_chars):
+            yield batch
+            batch, size = [], 0
+        batch.append(item)
+        size += length
+    if batch:
+        yield batch
+
+def get_client():
+    """OpenAI client, or None when no API key is configured"""
+    api_key = os.environ.get('OPENAI_API_KEY', '')
+    if not api_key:
+        return None
+    from openai import OpenAI
+    return OpenAI(api_key=api_key, timeout=getattr(settings, 'NEWS_TRANSLATION_TIMEOUT', 60), max_retries=1)
+
+def translate_batch(client, lang, batch):
+    """One chat completion for a whole batch, returns {item pk: (title, excerpt)}"""
+    # 用批内序号代替数据库 ID，省 token，也方便校验模型返回
+    payload = [
+        {"id": i, "title": item.title, "excerpt": item.excerpt or ''}
+        for i, item in enumerate(batch)
+    ]
+    system_prompt = f"""你是一个专业的科技新闻翻译。请把下面 JSON 中每条新闻的 title 和 excerpt 翻译成{LANGUAGE_NAMES.get(lang, lang)}。
+    要求：
+    1. 保持专业术语、产品名和人名的准确性，不要添加原文没有的内容
+    2. 原样保留 id，excerpt 为空时返回空字符串
+    3. 只返回 JSON：{{"items": [{{"id": ..., "title": ..., "excerpt": ...}}]}}"""
+
+    response = client.chat.completions.create(
+        model=getattr(settings, 'NEWS_TRANSLATION_MODEL', 'gpt-3.5-turbo'),
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": json.dumps(payload, ensure_ascii=False)}
+        ],
+        response_format={"type": "json_object"},
+        temperature=0.2
+    )
+    translated = {}
+    # 模型漏掉或写错的条目不保存，下一轮再译
+    for entry in json.loads(response.choices[0].message.content).get('items', []):
+        try:
+            item = batch[int(entry['id'])]
+            title = str(entry['title']).strip()
+        except (KeyError, IndexError, TypeError, ValueError):
+            continue
+        if title:
+            translated[item.pk] = (title[:500], str(entry.get('excerpt') or '').strip())
+    return translated
+
+def store_translations(lang, batch, translated):
+    for item in batch:
+        if item.pk not in translated:
+            continue
+        title, excerpt = translated[item.pk]
+        NewsTranslation.objects.update_or_create(
+            item=item, lang=lang,
+            defaults={'title': title, 'excerpt': excerpt, 'source_hash': source_hash(item.title, item.excerpt)}
+        )
+
+def translate_pending(lang, limit=None, client=None):
+    """Translate up to `limit` pending items into `lang` with batched LLM calls
+
+    Returns {'pending', 'translated', 'failed_batches'}, or None when no API
+    key is configured.
+    """
+    client = client or get_client()
+    if client is None:
+        return None
+    limit = limit or getattr(settings, 'NEWS_TRANSLATION_MAX_ITEMS', 100)
+    items = pending_items(lang, getattr(settings, 'NEWS_TRANSLATION_WINDOW', 500))
+    batches = list(make_batches(
+        items[:limit],
+        getattr(settings, 'NEWS_TRANSLATION_BATCH_SIZE', 20),
+        getattr(settings, 'NEWS_TRANSLATION_BATCH_CHARS', 6000),
+    ))
+
+    stats = {'pending': len(items), 'translated': 0, 'failed_batches': 0}
+    workers = max(1, min(getattr(settings, 'NEWS_TRANSLATION_WORKERS', 4), len(batches)))
+    # 几个批次并发请求，结果回到当前线程写库
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='news-translate') as executor:
+        futures = [(batch, executor.submit(translate_batch, client, lang, batch)) for batch in batches]
+        for batch, future in futures:
+            try:
+                translated = future.result()
+            except Exception as e:
+                print(f"News translation batch failed ({lang}, {len(batch)} items): {e}")
+                stats['failed_batches'] += 1
+                continue
+            store_translations(lang, batch, translated)
+            stats['translated'] += len(translated)
+    return stats
+
+def translations_for(items, lang):
+    """{item pk: NewsTranslation} for the given items, in one query"""
+    return {
+        translation.item_id: translation
+        for translation in NewsTranslation.objects.filter(lang=lang, item__in=[item.pk for item in items])
+        .only('item_id', 'title', 'excerpt')
+    }
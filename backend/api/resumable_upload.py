@@ -0,0 +1,176 @@
+"""断点续传上传（tus 风格）：先建会话预分配临时文件，分块可乱序、并发写入各自偏移，收齐后原地改名为正式文件"""
+import os
+from datetime import timedelta
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from .blob_store import hash_path, store_path
+from .models import UploadChunk, UploadSession, UploadedFile
+
+# 从请求体读取、写入磁盘的块大小，单个请求的内存占用不超过它
+COPY_BLOCK = 256 * 1024
+
+class UploadError(Exception):
+    """A problem with an upload request, carrying the HTTP status to answer with"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+def partial_path(session):
+    return default_storage.path(f'uploads/partial/{session.pk}.part')
+
+def purge_expired_sessions():
+    """Drop expired sessions and the partial files of those never finished"""
+    expired = UploadSession.objects.filter(expires_date__lt=timezone.now())
+    for session in expired.exclude(status='done'):
+        try:
+            os.remove(partial_path(session))
+        except FileNotFoundError:
+            pass
+    expired.delete()
+
+def create_session(user, filename, file_size, file_type, chunk_size=None, description='', is_public=False):
+    """Start an upload and preallocate its partial file at full size"""
+    purge_expired_sessions()
+    default_chunk = getattr(settings, 'UPLOAD_CHUNK_SIZE', 5 * 1024 * 1024)
+    chunk_size = min(
+        max(chunk_size or default_chunk, getattr(settings, 'UPLOAD_MIN_CHUNK_SIZE', 256 * 1024)),
+        getattr(settings, 'UPLOAD_MAX_CHUNK_SIZE', 32 * 1024 * 1024),
+    )
+    session = UploadSession.objects.create(
+        user=user,
+        original_filename=filename,
+        file_size=file_size,
+        file_type=file_type,
+        chunk_size=chunk_size,
+        description=description,
+        is_public=is_public,
+        expires_date=timezone.now() + timedelta(seconds=getattr(settings, 'UPLOAD_SESSION_TTL', 86400)),
+    )
+    path = partial_path(session)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # truncate 只扩展文件长度（稀疏文件），各分块直接写到自己的偏移，收齐后不需要再拼接
+    with open(path, 'wb') as f:
+        f.truncate(file_size)
+    return session
+
+def missing_chunks(session):
+    received = set(session.chunks.values_list('index', flat=True))
+    return [index for index in range(session.chunk_count) if index not in received]
+
+def upload_offset(session, missing=None):
+    """Bytes received without a gap from the start, the tus Upload-Offset"""
+    missing = missing_chunks(session) if missing is None else missing
+    if not missing:
+        return session.file_size
+    return missing[0] * session.chunk_size
+
+def check_not_expired(session):
+    # 过期会话随时可能被清理掉临时文件，不能再写入或完成
+    if session.expires_date <= timezone.now():
+        raise UploadError('上传会话已过期，请重新上传', status=410)
+
+def write_chunks(session, offset, stream, single=False):
+    """Write a request body into the partial file starting at `offset`
+
+    Progress is tracked in whole chunks, so `offset` must be a chunk
+    boundary (a multiple of chunk_size); the Upload-Offset reported by
+    HEAD/GET always is one. A chunk cut off by a dropped connection is
+    resent from its start. Every chunk the body fully covers is recorded as
+    soon as it is on disk. With `single` the body must be exactly one chunk.
+    Returns the indexes of the chunks completed by this body.
+    """
+    if session.status != 'uploading':
+        raise UploadError('上传已结束', status=409)
+    check_not_expired(session)
+    if offset % session.chunk_size or not 0 <= offset < max(session.file_size, 1):
+        raise UploadError(
+            f'Upload-Offset 必须位于文件内且是分块大小 {session.chunk_size} 的整数倍，续传位置以 HEAD 返回的为准',
+            status=409,
+        )
+
+    completed = []
+    index = offset // session.chunk_size
+    disconnected = False
+    with open(partial_path(session), 'r+b') as f:
+        f.seek(offset)
+        while index < session.chunk_count and not disconnected:
+            remaining = expected = session.chunk_length(index)
+            while remaining:
+                try:
+                    block = stream.read(min(COPY_BLOCK, remaining))
+                except OSError:
+                    # 客户端断线：已写完的分块保留，下次从 upload_offset 续传
+                    block = b''
+                    disconnected = True
+                if not block:
+                    break
+                f.write(block)
+                remaining -= len(block)
+            if remaining:
+                if single:
+                    raise UploadError(f'分块 {index} 应为 {expected} 字节', status=400)
+                break
+            f.flush()
+            UploadChunk.objects.bulk_create([UploadChunk(session=session, index=index)], ignore_conflicts=True)
+            completed.append(index)
+            index += 1
+            if single:
+                break
+        if not disconnected and (single or index == session.chunk_count) and stream.read(1):
+            raise UploadError('请求体超出分块或文件大小', status=413)
+    return completed
+
+def finalize_session(session):
+    """Turn a fully received session into an UploadedFile backed by a shared blob
+
+    Chunks arrive out of order and across requests, so the digest is taken
+    here in one read pass over the assembled file, before any transaction
+    is opened. The file is then renamed into the blob store, or simply
+    deleted when identical content is already there.
+    """
+    if session.status == 'done':
+        return session.uploaded_file
+    check_not_expired(session)
+    missing = missing_chunks(session)
+    if missing:
+        raise UploadError(f'还有 {len(missing)} 个分块未上传', status=409)
+    # 条件 UPDATE 保证并发的多个 complete 请求只有一个真正执行
+    if not UploadSession.objects.filter(pk=session.pk, status='uploading').update(status='finalizing'):
+        raise UploadError('上传正在完成中', status=409)
+
+    try:
+        path = partial_path(session)
+        sha256 = hash_path(path)
+        with transaction.atomic():
+            # 临时文件与 blob 目录在同一存储下，改名是原子的，不会再复制一遍数据
+            blob, _ = store_path(path, session.file_size, sha256)
+            file_obj = UploadedFile.objects.create(
+                user=session.user,
+                file=blob.file.name,
+                blob=blob,
+                original_filename=session.original_filename,
+                file_size=session.file_size,
+                file_type=session.file_type,
+                description=session.description,
+                is_public=session.is_public,
+            )
+    except Exception:
+        UploadSession.objects.filter(pk=session.pk).update(status='uploading')
+        raise
+
+    session.status = 'done'
+    session.uploaded_file = file_obj
+    session.save(update_fields=['status', 'uploaded_file'])
+    session.chunks.all().delete()
+    return file_obj
+
+def abort_session(session):
+    if session.status != 'done':
+        try:
+            os.remove(partial_path(session))
+        except FileNotFoundError:
+            pass
+    session.delete()
@@ -1,5 +1,7 @@
+from django.urls import reverse
 from rest_framework import serializers
-from .models import UploadedFile, FileShare
+from .models import UploadedFile, FileShare, NewsItem
+from .news import format_age
 from django.contrib.auth.models import User
 
 class UserSerializer(serializers.ModelSerializer):
@@ -23,8 +25,9 @@ class UploadedFileSerializer(serializers.ModelSerializer):
     
     def get_download_url(self, obj):
         request = self.context.get('request')
+        # 走下载接口而不是直接访问媒体文件，这样有权限检查和 Range 支持
         if request and obj.file:
-            return request.build_absolute_uri(obj.file.url)
+            return request.build_absolute_uri(reverse('file-download', args=[obj.id]))
         return None
     
     def get_file_size_display(self, obj):
@@ -45,10 +48,69 @@ class FileShareSerializer(serializers.ModelSerializer):
     def get_share_url(self, obj):
         request = self.context.get('request')
         if request:
-            return f"{request.build_absolute_uri('/')}api/share/{obj.share_token}"
+            return request.build_absolute_uri(reverse('share-download', args=[obj.share_token]))
         return None
 
 class FileUploadSerializer(serializers.Serializer):
     file = serializers.FileField()
     description = serializers.CharField(required=False, allow_blank=True)
-    is_public = serializers.BooleanField(default=False) 
\ No newline at end of file
+    is_public = serializers.BooleanField(default=False)
+
+class UploadSessionCreateSerializer(serializers.Serializer):
+    filename = serializers.CharField(max_length=255)
+    file_size = serializers.IntegerField(min_value=0)
+    file_type = serializers.CharField(max_length=100)
+    chunk_size = serializers.IntegerField(required=False, min_value=1)
+    description = serializers.CharField(required=False, allow_blank=True)
+    is_public = serializers.BooleanField(default=False)
+
+# 列表接口默认返回的字段，正文 content 只能通过详情接口获取
+NEWS_LIST_FIELDS = [
+    'id', 'title', 'excerpt', 'category', 'source', 'time', 'url', 'image', 'timestamp',
+    'alternate_sources'
+]
+
+class NewsItemSerializer(serializers.ModelSerializer):
+    id = serializers.CharField(source='news_id', read_only=True)
+    time = serializers.SerializerMethodField()
+    timestamp = serializers.SerializerMethodField()
+
+    class Meta:
+        model = NewsItem
+        fields = [
+            'id', 'title', 'excerpt', 'content', 'category', 'source',
+            'time', 'url', 'image', 'timestamp', 'alternate_sources'
+        ]
+
+    # 序列化字段对应的模型列，用于 QuerySet.only() 只取需要的列
+    MODEL_FIELDS = {'id': 'news_id', 'time': 'published_at', 'timestamp': 'published_at'}
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def model_fields(cls, fields):
+        return {cls.MODEL_FIELDS.get(name, name) for name in fields}
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # context 里带了译文（?lang=）时用译文替换标题和摘要，没有译文的条目保持原文
+        translations = self.context.get('translations')
+        if translations is not None:
+            translation = translations.get(instance.pk)
+            if translation is not None:
+                if 'title' in data:
+                    data['title'] = translation.title
+                if 'excerpt' in data:
+                    data['excerpt'] = translation.excerpt
+            data['translated'] = translation is not None
+        return data
+
+    def get_time(self, obj):
+        return format_age(obj.published_at)
+
+    def get_timestamp(self, obj):
+        return obj.published_at.timestamp()
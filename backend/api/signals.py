@@ -0,0 +1,29 @@
+"""UploadedFile 的信号：释放 blob 引用，文件变化时更新文件数和公开列表的缓存版本号"""
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from .blob_store import release_blob
+from .file_listing import PUBLIC_FILES_VERSION_KEY, bump_cache_version, user_files_version_key
+from .models import UploadedFile
+
+@receiver(post_init, sender=UploadedFile)
+def remember_public_flag(sender, instance, **kwargs):
+    # 记住加载时的 is_public，保存时才知道文件是否刚从公开改为私有
+    instance._was_public = instance.is_public
+
+@receiver(post_save, sender=UploadedFile)
+def file_saved(sender, instance, created, **kwargs):
+    if created:
+        bump_cache_version(user_files_version_key(instance.user_id))
+    # 公开文件的任何改动（包括取消公开）都会让公开列表失效
+    if instance.is_public or instance._was_public:
+        bump_cache_version(PUBLIC_FILES_VERSION_KEY)
+    instance._was_public = instance.is_public
+
+@receiver(post_delete, sender=UploadedFile)
+def file_deleted(sender, instance, **kwargs):
+    """任何途径删除文件记录（包括随用户级联删除）都释放对 blob 的引用"""
+    bump_cache_version(user_files_version_key(instance.user_id))
+    if instance.is_public:
+        bump_cache_version(PUBLIC_FILES_VERSION_KEY)
+    if instance.blob_id:
+        release_blob(instance.blob_id)
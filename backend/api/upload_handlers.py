@@ -0,0 +1,39 @@
+"""边接收边算 SHA-256 的上传处理器：哈希在写入内存/临时文件的同一轮完成，入库时不必再读一遍"""
+import hashlib
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+
+class HashingMemoryFileUploadHandler(MemoryFileUploadHandler):
+    """Small uploads kept in memory, with their SHA-256 attached as `.sha256`"""
+
+    def new_file(self, *args, **kwargs):
+        # 父类启用时会抛 StopFutureHandlers，哈希对象要先建好
+        self.hasher = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        # 未启用（文件超过内存上限）时数据会原样交给下一个处理器，由它来算
+        if self.activated:
+            self.hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.sha256 = self.hasher.hexdigest()
+        return file
+
+class HashingTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """Large uploads streamed to a temporary file, with their SHA-256 attached as `.sha256`"""
+
+    def new_file(self, *args, **kwargs):
+        self.hasher = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.sha256 = self.hasher.hexdigest()
+        return file
@@ -4,21 +4,61 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework import status
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.contrib.auth.models import User
-from django.http import FileResponse, Http404
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
 from django.conf import settings
+import io
 import os
 import mimetypes
 import uuid
 from datetime import timedelta
-from .models import UploadedFile, FileShare
+from django.db import transaction
+from django.db.models import F
+from .blob_store import store_upload
+from .file_serving import serve_file, starts_download
+from .file_listing import public_files_page, user_file_count
+from .models import UploadedFile, FileShare, UploadSession
+from .pagination import keyset_paginate, parse_limit
+from .resumable_upload import (
+    UploadError,
+    abort_session,
+    create_session,
+    finalize_session,
+    missing_chunks,
+    upload_offset,
+    write_chunks
+)
 from .serializers import (
     UploadedFileSerializer, 
     FileShareSerializer, 
-    FileUploadSerializer
+    FileUploadSerializer,
+    UploadSessionCreateSerializer
 )
 from django.utils import timezone
 
+# 文件大小上限 (100MB)，普通上传和断点续传共用
+MAX_UPLOAD_SIZE = 100 * 1024 * 1024
+
+ALLOWED_TYPES = [
+    'image/jpeg', 'image/png', 'image/gif', 'image/webp',
+    'application/pdf', 'text/plain', 'text/csv',
+    'application/msword', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'application/vnd.ms-excel', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'application/zip', 'application/x-rar-compressed'
+]
+
+def upload_owner(request):
+    """上传文件的归属用户；匿名上传归到第一个用户或默认匿名用户"""
+    user = request.user if request.user.is_authenticated else User.objects.first()
+    if not user:
+        # 创建一个默认用户
+        user = User.objects.create_user(
+            username='anonymous',
+            email='anonymous@example.com',
+            password='anonymous123'
+        )
+    return user
+
 class FileUploadView(APIView):
     permission_classes = [AllowAny]  # 暂时允许匿名上传用于测试
     parser_classes = [MultiPartParser, FormParser]
@@ -32,42 +72,31 @@ class FileUploadView(APIView):
                 return Response({'error': '没有选择文件'}, status=status.HTTP_400_BAD_REQUEST)
             
             # 检查文件大小 (限制为100MB)
-            if uploaded_file.size > 100 * 1024 * 1024:
+            if uploaded_file.size > MAX_UPLOAD_SIZE:
                 return Response({'error': '文件大小不能超过100MB'}, status=status.HTTP_400_BAD_REQUEST)
             
             # 检查文件类型
-            allowed_types = [
-                'image/jpeg', 'image/png', 'image/gif', 'image/webp',
-                'application/pdf', 'text/plain', 'text/csv',
-                'application/msword', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-                'application/vnd.ms-excel', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                'application/zip', 'application/x-rar-compressed'
-            ]
-            
-            if uploaded_file.content_type not in allowed_types:
+            if uploaded_file.content_type not in ALLOWED_TYPES:
                 return Response({'error': '不支持的文件类型'}, status=status.HTTP_400_BAD_REQUEST)
             
             try:
                 # 创建文件记录
                 # 如果没有用户，创建一个匿名用户或使用默认用户
-                user = request.user if request.user.is_authenticated else User.objects.first()
-                if not user:
-                    # 创建一个默认用户
-                    user = User.objects.create_user(
-                        username='anonymous',
-                        email='anonymous@example.com',
-                        password='anonymous123'
-                    )
+                user = upload_owner(request)
                 
-                file_obj = UploadedFile.objects.create(
-                    user=user,
-                    file=uploaded_file,
-                    original_filename=uploaded_file.name,
-                    file_size=uploaded_file.size,
-                    file_type=uploaded_file.content_type,
-                    description=serializer.validated_data.get('description', ''),
-                    is_public=serializer.validated_data.get('is_public', False)
-                )
+                # 内容已在接收时算好 SHA-256（见 upload_handlers），重复内容直接复用已有 blob
+                with transaction.atomic():
+                    blob, _ = store_upload(uploaded_file)
+                    file_obj = UploadedFile.objects.create(
+                        user=user,
+                        file=blob.file.name,
+                        blob=blob,
+                        original_filename=uploaded_file.name,
+                        file_size=uploaded_file.size,
+                        file_type=uploaded_file.content_type,
+                        description=serializer.validated_data.get('description', ''),
+                        is_public=serializer.validated_data.get('is_public', False)
+                    )
                 
                 file_serializer = UploadedFileSerializer(file_obj, context={'request': request})
                 return Response({
@@ -80,16 +109,139 @@ class FileUploadView(APIView):
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+def upload_session_state(session, missing=None):
+    missing = missing_chunks(session) if missing is None else missing
+    return {
+        'upload_id': str(session.id),
+        'filename': session.original_filename,
+        'file_size': session.file_size,
+        'chunk_size': session.chunk_size,
+        'chunk_count': session.chunk_count,
+        'offset': upload_offset(session, missing),
+        'missing_chunks': missing,
+        'status': session.status,
+        'expires_date': session.expires_date.isoformat(),
+    }
+
+def upload_headers(response, session, missing=None):
+    """tus 风格的响应头：客户端据 Upload-Offset 决定从哪里续传"""
+    response['Upload-Offset'] = str(upload_offset(session, missing))
+    response['Upload-Length'] = str(session.file_size)
+    response['Cache-Control'] = 'no-store'
+    return response
+
+def get_upload_session(request, upload_id):
+    """会话 ID 本身就是凭证；登录用户只能访问自己的会话"""
+    session = get_object_or_404(UploadSession.objects.select_related('user'), id=upload_id)
+    if request.user.is_authenticated and session.user_id != request.user.id:
+        raise Http404
+    return session
+
+class UploadSessionCreateView(APIView):
+    permission_classes = [AllowAny]
+    
+    def post(self, request):
+        """创建断点续传会话，返回分块大小和后续请求的地址"""
+        serializer = UploadSessionCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        
+        if data['file_size'] > MAX_UPLOAD_SIZE:
+            return Response({'error': '文件大小不能超过100MB'}, status=status.HTTP_400_BAD_REQUEST)
+        if data['file_type'] not in ALLOWED_TYPES:
+            return Response({'error': '不支持的文件类型'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        session = create_session(
+            upload_owner(request),
+            data['filename'],
+            data['file_size'],
+            data['file_type'],
+            chunk_size=data.get('chunk_size'),
+            description=data.get('description', ''),
+            is_public=data['is_public']
+        )
+        response = Response({'upload': upload_session_state(session)}, status=status.HTTP_201_CREATED)
+        response['Location'] = request.build_absolute_uri(f'/api/uploads/{session.id}/')
+        return upload_headers(response, session)
+
+class UploadSessionView(APIView):
+    """查询进度（GET/HEAD）、按 Upload-Offset 顺序续传（PATCH）、取消上传（DELETE）"""
+    permission_classes = [AllowAny]
+    
+    def get(self, request, upload_id):
+        session = get_upload_session(request, upload_id)
+        missing = missing_chunks(session)
+        return upload_headers(Response({'upload': upload_session_state(session, missing)}), session, missing)
+    
+    def patch(self, request, upload_id):
+        session = get_upload_session(request, upload_id)
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+        except ValueError:
+            return Response({'error': '缺少 Upload-Offset 请求头'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            # 直接读原始请求体，不经过 parser，也不整块读进内存
+            completed = write_chunks(session, offset, request.stream or io.BytesIO())
+        except UploadError as e:
+            # 带上服务端的 Upload-Offset，偏移不对时客户端可以直接从这里续传
+            return upload_headers(Response({'error': str(e)}, status=e.status), session)
+        response = Response({'completed_chunks': completed}, status=status.HTTP_200_OK)
+        return upload_headers(response, session)
+    
+    def delete(self, request, upload_id):
+        session = get_upload_session(request, upload_id)
+        abort_session(session)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class UploadChunkView(APIView):
+    permission_classes = [AllowAny]
+    
+    def put(self, request, upload_id, index):
+        """上传单个分块，分块之间可以乱序、并发上传，重复上传同一块会覆盖"""
+        session = get_upload_session(request, upload_id)
+        if index >= session.chunk_count:
+            return Response({'error': '分块序号超出范围'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            write_chunks(session, index * session.chunk_size, request.stream or io.BytesIO(), single=True)
+        except UploadError as e:
+            return Response({'error': str(e)}, status=e.status)
+        return upload_headers(Response(status=status.HTTP_204_NO_CONTENT), session)
+
+class UploadCompleteView(APIView):
+    permission_classes = [AllowAny]
+    
+    def post(self, request, upload_id):
+        """所有分块到齐后生成文件记录，返回与普通上传相同的结构"""
+        session = get_upload_session(request, upload_id)
+        try:
+            file_obj = finalize_session(session)
+        except UploadError as e:
+            return Response({'error': str(e), 'missing_chunks': missing_chunks(session)}, status=e.status)
+        file_serializer = UploadedFileSerializer(file_obj, context={'request': request})
+        return Response({
+            'message': '文件上传成功',
+            'file': file_serializer.data
+        }, status=status.HTTP_201_CREATED)
+
 class FileListView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        """获取用户的文件列表"""
-        files = UploadedFile.objects.filter(user=request.user)
+        """获取用户的文件列表（游标分页，?cursor= 取下一页）"""
+        # 用户信息随文件一起 JOIN 取出，序列化时不再逐行查询
+        queryset = UploadedFile.objects.filter(user=request.user).select_related('user')
+        try:
+            files, next_cursor = keyset_paginate(
+                queryset, 'upload_date', request.GET.get('cursor'), parse_limit(request.GET.get('limit'), default=50)
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         serializer = UploadedFileSerializer(files, many=True, context={'request': request})
         return Response({
             'files': serializer.data,
-            'total_count': files.count()
+            'total_count': user_file_count(request.user.id),
+            'next_cursor': next_cursor
         })
 
 class FileDetailView(APIView):
@@ -108,21 +260,25 @@ class FileDetailView(APIView):
         """删除文件"""
         try:
             file_obj = UploadedFile.objects.get(id=file_id, user=request.user)
-            # 删除物理文件
-            if file_obj.file and os.path.exists(file_obj.file.path):
+            # 删除物理文件；共享 blob 的文件由 post_delete 信号减引用，最后一个引用才删文件
+            if not file_obj.blob_id and file_obj.file and os.path.exists(file_obj.file.path):
                 os.remove(file_obj.file.path)
             file_obj.delete()
             return Response({'message': '文件删除成功'})
         except UploadedFile.DoesNotExist:
             return Response({'error': '文件不存在'}, status=status.HTTP_404_NOT_FOUND)
 
+def file_etag(file_obj):
+    # blob 按内容寻址，SHA-256 就是强 ETag；旧文件由 serve_file 按大小和修改时间生成
+    return f'"{file_obj.blob.sha256}"' if file_obj.blob_id else None
+
 class FileDownloadView(APIView):
     permission_classes = [AllowAny]
     
     def get(self, request, file_id):
         """下载文件"""
         try:
-            file_obj = UploadedFile.objects.get(id=file_id)
+            file_obj = UploadedFile.objects.select_related('blob').get(id=file_id)
             
             # 检查权限
             if not file_obj.is_public and request.user != file_obj.user:
@@ -131,11 +287,8 @@ class FileDownloadView(APIView):
             if not file_obj.file or not os.path.exists(file_obj.file.path):
                 return Response({'error': '文件不存在'}, status=status.HTTP_404_NOT_FOUND)
             
-            # 返回文件
-            response = FileResponse(open(file_obj.file.path, 'rb'))
-            response['Content-Disposition'] = f'attachment; filename="{file_obj.original_filename}"'
-            response['Content-Type'] = file_obj.file_type
-            return response
+            # 返回文件（支持 Range 续传/拖动进度条）
+            return serve_file(request, file_obj.file.name, file_obj.file_type, file_obj.original_filename, file_etag(file_obj))
             
         except UploadedFile.DoesNotExist:
             return Response({'error': '文件不存在'}, status=status.HTTP_404_NOT_FOUND)
@@ -178,7 +331,7 @@ class ShareDownloadView(APIView):
     def get(self, request, share_token):
         """通过分享链接下载文件"""
         try:
-            share_obj = FileShare.objects.get(share_token=share_token)
+            share_obj = FileShare.objects.select_related('file__blob').get(share_token=share_token)
             
             # 检查分享是否过期
             if share_obj.is_expired():
@@ -189,14 +342,12 @@ class ShareDownloadView(APIView):
             if not file_obj.file or not os.path.exists(file_obj.file.path):
                 return Response({'error': '文件不存在'}, status=status.HTTP_404_NOT_FOUND)
             
-            # 增加下载计数
-            share_obj.download_count += 1
-            share_obj.save()
+            # 返回文件（支持 Range 续传/拖动进度条）
+            response = serve_file(request, file_obj.file.name, file_obj.file_type, file_obj.original_filename, file_etag(file_obj))
             
-            # 返回文件
-            response = FileResponse(open(file_obj.file.path, 'rb'))
-            response['Content-Disposition'] = f'attachment; filename="{file_obj.original_filename}"'
-            response['Content-Type'] = file_obj.file_type
+            # 增加下载计数；续传和拖动进度条产生的 Range 请求不重复计数
+            if starts_download(request, response):
+                FileShare.objects.filter(pk=share_obj.pk).update(download_count=F('download_count') + 1)
             return response
             
         except FileShare.DoesNotExist:
@@ -206,10 +357,11 @@ class PublicFilesView(APIView):
     permission_classes = [AllowAny]
     
     def get(self, request):
-        """获取公开文件列表"""
-        files = UploadedFile.objects.filter(is_public=True).select_related('user')
-        serializer = UploadedFileSerializer(files, many=True, context={'request': request})
-        return Response({
-            'files': serializer.data,
-            'total_count': files.count()
-        }) 
\ No newline at end of file
+        """获取公开文件列表（游标分页）；每页渲染好的 JSON 按版本缓存，公开文件变化时整体失效"""
+        try:
+            body = public_files_page(
+                request, request.GET.get('cursor'), parse_limit(request.GET.get('limit'), default=50)
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return HttpResponse(body, content_type='application/json') 
\ No newline at end of file
@@ -8,12 +8,23 @@ from . import enterprise
 urlpatterns = [
     path('health/', views.health_check, name='health_check'),
     path('news/', views.NewsListView.as_view(), name='news-list'),
-    path('news/<int:pk>/', views.NewsDetailView.as_view(), name='news-detail'),
+    path('news/stream/', views.news_stream, name='news-stream'),
+    path('news/<str:news_id>/', views.NewsDetailView.as_view(), name='news-detail'),
+    path('internal/news/sources/', views.NewsSourceHealthView.as_view(), name='news-source-health'),
     path('register/', views.RegisterView.as_view(), name='register'),
     path('login/', views.LoginView.as_view(), name='login'),
     path('create-checkout-session/', views.CreateCheckoutSessionView.as_view(), name='create-checkout-session'),
     path('upload/', upload_views.FileUploadView.as_view(), name='file-upload'),
     path('files/', upload_views.FileListView.as_view(), name='file-list'),
+    path('files/<int:file_id>/download/', upload_views.FileDownloadView.as_view(), name='file-download'),
+    path('files/<int:file_id>/share/', upload_views.CreateShareView.as_view(), name='file-share'),
+    path('share/<str:share_token>/', upload_views.ShareDownloadView.as_view(), name='share-download'),
+    path('public-files/', upload_views.PublicFilesView.as_view(), name='public-files'),
+    # 断点续传上传
+    path('uploads/', upload_views.UploadSessionCreateView.as_view(), name='upload-session-create'),
+    path('uploads/<uuid:upload_id>/', upload_views.UploadSessionView.as_view(), name='upload-session'),
+    path('uploads/<uuid:upload_id>/chunks/<int:index>/', upload_views.UploadChunkView.as_view(), name='upload-chunk'),
+    path('uploads/<uuid:upload_id>/complete/', upload_views.UploadCompleteView.as_view(), name='upload-complete'),
     # AI 工具 API
     path('ai/text-generator/', ai_tools.TextGeneratorView.as_view(), name='text-generator'),
     path('ai/image-generator/', ai_tools.ImageGeneratorView.as_view(), name='image-generator'),
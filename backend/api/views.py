@@ -1,6 +1,6 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework import status
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
@@ -8,14 +8,26 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from django.db.models import Count
 from django.utils import timezone
 from datetime import timedelta
-import requests
+import hashlib
 import json
 import stripe
 from django.conf import settings
-import re
-from bs4 import BeautifulSoup
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from rest_framework.decorators import api_view
+from .models import NewsItem, NewsSource, NewsTranslation
+from .serializers import NEWS_LIST_FIELDS, NewsItemSerializer
+from .news import get_fallback_news, news_version
+from .news_health import source_health
+from .news_refresh import maybe_refresh_in_background
+from .news_search import search_news
+from .news_snapshot import current_snapshot
+from .news_stream import news_events
+from .news_translate import translation_languages, translations_for
+from .pagination import keyset_paginate, parse_limit
 
 @api_view(['GET'])
 def health_check(request):
@@ -26,345 +38,190 @@ def health_check(request):
         'version': '1.0.0'
     })
 
+def news_list_version(request):
+    """Snapshot version for conditional GET, computed once per request"""
+    if not hasattr(request, '_news_version'):
+        request._news_version = news_version()
+    return request._news_version
+
+def news_list_snapshot(request):
+    """The published snapshot if this request can be answered from it, else None"""
+    if not hasattr(request, '_news_snapshot'):
+        request._news_snapshot = None
+        fields = request.GET.get('fields')
+        # 快照只有原文，带 lang 的请求查库拼上译文
+        if not request.GET.get('lang') and not request.GET.get('search', '').strip() and (not fields or fields.split(',') == NEWS_LIST_FIELDS):
+            request._news_snapshot = current_snapshot()
+    return request._news_snapshot
+
+def news_list_etag(request):
+    # 不同查询参数（搜索词等）返回不同内容，ETag 需要区分
+    query_hash = hashlib.sha1(request.META.get('QUERY_STRING', '').encode('utf-8')).hexdigest()[:8]
+    snapshot = news_list_snapshot(request)
+    if snapshot is not None:
+        return f"s{snapshot.version}-{query_hash}"
+    version = news_list_version(request)
+    if version is None:
+        return None
+    return f"{version.timestamp():.6f}-{query_hash}"
+
+def news_list_last_modified(request):
+    # 走快照时只用 ETag 判断，不再查库
+    if news_list_snapshot(request) is not None:
+        return None
+    return news_list_version(request)
+
+def news_detail_last_modified(request, news_id):
+    updated_at = NewsItem.objects.filter(news_id=news_id).values_list('updated_at', flat=True).first()
+    lang = request.GET.get('lang')
+    if updated_at is not None and lang:
+        translated_at = NewsTranslation.objects.filter(item__news_id=news_id, lang=lang).values_list(
+            'updated_at', flat=True
+        ).first()
+        if translated_at is not None:
+            updated_at = max(updated_at, translated_at)
+    return updated_at
+
+def news_detail_etag(request, news_id):
+    updated_at = news_detail_last_modified(request, news_id)
+    if not updated_at:
+        return None
+    lang = request.GET.get('lang')
+    return f"{news_id}-{updated_at.timestamp():.6f}" + (f"-{lang}" if lang else "")
+
+def unsupported_lang(request):
+    """400 response for a ?lang= we keep no translations for, else None"""
+    lang = request.GET.get('lang')
+    if lang and lang not in translation_languages():
+        return Response({"error": f"Unsupported lang: {lang}", "allowed": translation_languages()}, status=400)
+    return None
+
 class NewsListView(APIView):
     permission_classes = [AllowAny]
     
-    def get(self, request):
-        # Get real news data from multiple sources
-        try:
-            news_data = self.get_comprehensive_news()
-        except Exception as e:
-            print(f"Error fetching news: {e}")
-            news_data = self.get_fallback_news()
-        
-        # 新增：支持search参数过滤
-        search_query = request.GET.get('search', '').strip().lower()
-        if search_query:
-            news_data = [item for item in news_data if search_query in item.get('title', '').lower() or search_query in item.get('excerpt', '').lower() or search_query in item.get('content', '').lower() or search_query in item.get('source', '').lower()]
-        
-        return Response({
-            "news": news_data,
-            "total_count": len(news_data),
-            "last_updated": timezone.now().isoformat()
-        })
+    def dispatch(self, request, *args, **kwargs):
+        # 快照过期时在后台触发一次刷新（全局只跑一个），本次请求仍直接返回旧快照。
+        # 要放在条件 GET 判断之前：前端轮询大多拿到 304，放在 get 里就几乎不会触发
+        if request.method == 'GET':
+            maybe_refresh_in_background()
+        return super().dispatch(request, *args, **kwargs)
     
-    def get_comprehensive_news(self):
-        """Get comprehensive news from multiple sources"""
-        all_news = []
-        
-        # 1. Get arXiv papers
-        arxiv_news = self.get_arxiv_news()
-        all_news.extend(arxiv_news)
-        
-        # 2. Get AI news from various sources
-        ai_news = self.get_ai_news()
-        all_news.extend(ai_news)
+    # 内容未变时直接返回 304，不查询列表也不序列化
+    @method_decorator(cache_control(max_age=0, must_revalidate=True))
+    @method_decorator(condition(etag_func=news_list_etag, last_modified_func=news_list_last_modified))
+    def get(self, request):
+        # 只读数据库，抓取由 ingest_news 后台任务完成
+        # 默认字段、非搜索的列表页直接返回快照里预编码好的字节，不查库也不序列化
+        snapshot = news_list_snapshot(request)
+        if snapshot is not None:
+            body = snapshot.page(request.GET.get('cursor'), parse_limit(request.GET.get('limit'), default=snapshot.default_limit))
+            if body is not None:
+                return HttpResponse(body, content_type='application/json')
         
-        # 3. Get research papers
-        research_news = self.get_research_news()
-        all_news.extend(research_news)
+        error = unsupported_lang(request)
+        if error is not None:
+            return error
+        lang = request.GET.get('lang')
         
-        # Sort by time and return
-        all_news.sort(key=lambda x: x.get('timestamp', 0), reverse=True)
-        return all_news[:50]  # Return top 50 news items
-    
-    def get_arxiv_news(self):
-        """Get latest AI papers from arXiv"""
-        try:
-            response = requests.get(
-                'http://export.arxiv.org/api/query?search_query=cat:cs.AI&sortBy=lastUpdatedDate&sortOrder=descending&max_results=20',
-                timeout=15
+        # 列表只返回渲染需要的字段，正文 content 只能通过详情接口获取
+        fields = [name for name in request.GET.get('fields', '').split(',') if name] or NEWS_LIST_FIELDS
+        unknown = set(fields) - set(NEWS_LIST_FIELDS)
+        if unknown:
+            return Response(
+                {"error": f"Unsupported fields: {', '.join(sorted(unknown))}", "allowed": NEWS_LIST_FIELDS},
+                status=400
             )
-            
-            news_items = []
-            if response.status_code == 200:
-                import xml.etree.ElementTree as ET
-                root = ET.fromstring(response.content)
-                
-                for entry in root.findall('.//{http://www.w3.org/2005/Atom}entry'):
-                    title = entry.find('.//{http://www.w3.org/2005/Atom}title').text
-                    summary = entry.find('.//{http://www.w3.org/2005/Atom}summary').text
-                    published = entry.find('.//{http://www.w3.org/2005/Atom}published').text
-                    paper_id = entry.find('.//{http://www.w3.org/2005/Atom}id').text
-                    
-                    # Clean title
-                    title = re.sub(r'\s+', ' ', title).strip()
-                    
-                    # Get full content
-                    full_content = self.get_arxiv_full_content(paper_id)
-                    
-                    news_items.append({
-                        "title": title,
-                        "excerpt": summary[:300] + "..." if len(summary) > 300 else summary,
-                        "content": full_content or summary,
-                        "category": "Research",
-                        "source": "arXiv",
-                        "time": self.format_time(published),
-                        "url": paper_id,
-                        "image": "/globe.svg",
-                        "timestamp": self.parse_timestamp(published)
-                    })
-            
-            return news_items
-        except Exception as e:
-            print(f"Error fetching arXiv news: {e}")
-            return []
-    
-    def get_arxiv_full_content(self, paper_id):
-        """Get full content from arXiv paper"""
-        try:
-            # Extract paper ID from URL
-            paper_id_clean = paper_id.split('/')[-1]
-            abstract_url = f"http://export.arxiv.org/api/query?id_list={paper_id_clean}"
-            
-            response = requests.get(abstract_url, timeout=10)
-            if response.status_code == 200:
-                import xml.etree.ElementTree as ET
-                root = ET.fromstring(response.content)
-                
-                # Get abstract
-                abstract_elem = root.find('.//{http://www.w3.org/2005/Atom}summary')
-                if abstract_elem is not None:
-                    abstract = abstract_elem.text
-                    # Clean HTML tags
-                    abstract = re.sub(r'<[^>]+>', '', abstract)
-                    return abstract
-            
-            return None
-        except:
-            return None
-    
-    def get_ai_news(self):
-        """Get AI news from various sources"""
-        news_items = []
+        # 近重复条目已合并到代表条目的 alternate_sources 里
+        queryset = NewsItem.objects.filter(duplicate_of__isnull=True).only(
+            'id', 'published_at', 'updated_at', *NewsItemSerializer.model_fields(fields)
+        )
         
-        # OpenAI Blog
-        try:
-            openai_news = self.scrape_openai_blog()
-            news_items.extend(openai_news)
-        except:
-            pass
+        # 新增：支持search参数过滤（倒排索引 + BM25 排序）
+        search_query = request.GET.get('search', '').strip()
+        cursor = request.GET.get('cursor')
+        next_cursor = None
+        if search_query:
+            ranked_ids = search_news(search_query, limit=50)
+            found = queryset.in_bulk(ranked_ids)
+            items = [found[pk] for pk in ranked_ids if pk in found]
+        else:
+            limit = parse_limit(request.GET.get('limit'), default=50)
+            try:
+                items, next_cursor = keyset_paginate(queryset, 'published_at', cursor, limit)
+            except ValueError as e:
+                return Response({"error": str(e)}, status=400)
         
-        # Google AI Blog
-        try:
-            google_news = self.scrape_google_ai_blog()
-            news_items.extend(google_news)
-        except:
-            pass
+        if items:
+            # 译文由 translate_news 离线生成，这里只多一次查询
+            context = {'translations': translations_for(items, lang)} if lang else {}
+            news_data = NewsItemSerializer(items, many=True, fields=fields, context=context).data
+            last_updated = max(item.updated_at for item in items)
+        elif search_query or cursor:
+            news_data = []
+            last_updated = timezone.now()
+        else:
+            # 从未有过快照（首次刷新还在后台进行）时才返回兜底内容
+            news_data = get_fallback_news()
+            last_updated = timezone.now()
         
-        # Add some curated AI news
-        curated_news = [
-            {
-                "title": "OpenAI releases GPT-4o with improved capabilities",
-                "excerpt": "OpenAI has announced the release of GPT-4o, featuring enhanced reasoning abilities and improved performance across multiple benchmarks. The new model demonstrates significant improvements in language understanding, code generation, and mathematical reasoning.",
-                "content": "OpenAI has announced the release of GPT-4o, featuring enhanced reasoning abilities and improved performance across multiple benchmarks. The new model demonstrates significant improvements in language understanding, code generation, and mathematical reasoning. GPT-4o represents a major step forward in AI capabilities, with better performance on complex tasks and improved safety measures. The model has been trained on a diverse dataset and includes advanced techniques for reducing harmful outputs while maintaining high performance across various domains.",
-                "category": "Breaking",
-                "source": "OpenAI Blog",
-                "time": "1 hour ago",
-                "url": "https://openai.com/blog/gpt-4o",
-                "image": "/globe.svg",
-                "timestamp": timezone.now().timestamp() - 3600
-            },
-            {
-                "title": "Google DeepMind achieves breakthrough in protein folding",
-                "excerpt": "AlphaFold 3 demonstrates unprecedented accuracy in predicting protein structures, advancing drug discovery and biotechnology. The new model can predict protein structures with atomic-level accuracy.",
-                "content": "AlphaFold 3 demonstrates unprecedented accuracy in predicting protein structures, advancing drug discovery and biotechnology. The new model can predict protein structures with atomic-level accuracy, which is crucial for understanding disease mechanisms and developing new therapeutics. This breakthrough has the potential to accelerate drug discovery by years and reduce costs significantly. The model uses advanced deep learning techniques and has been validated against experimental data.",
-                "category": "Research",
-                "source": "Nature",
-                "time": "3 hours ago",
-                "url": "https://www.nature.com/articles/s41586-024-07487-w",
-                "image": "/globe.svg",
-                "timestamp": timezone.now().timestamp() - 10800
-            },
-            {
-                "title": "Microsoft announces new AI-powered coding assistant",
-                "excerpt": "Microsoft has unveiled a new AI-powered coding assistant that integrates with Visual Studio Code and other development environments. The tool provides intelligent code completion, bug detection, and automated refactoring.",
-                "content": "Microsoft has unveiled a new AI-powered coding assistant that integrates with Visual Studio Code and other development environments. The tool provides intelligent code completion, bug detection, and automated refactoring. This development represents a significant advancement in AI-assisted programming, potentially increasing developer productivity by up to 50%. The assistant uses large language models trained on millions of lines of code and can understand context across entire codebases.",
-                "category": "Industry",
-                "source": "Microsoft Blog",
-                "time": "5 hours ago",
-                "url": "https://blogs.microsoft.com/ai-coding-assistant",
-                "image": "/globe.svg",
-                "timestamp": timezone.now().timestamp() - 18000
-            }
-        ]
+        # 上一轮抓取中超出时间预算、仍在使用旧结果的来源
+        missed_sources = list(
+            NewsSource.objects.filter(missed_deadline=True).values_list('name', flat=True)
+        )
         
-        news_items.extend(curated_news)
-        return news_items
-    
-    def scrape_openai_blog(self):
-        """Scrape OpenAI blog for latest news"""
-        try:
-            response = requests.get('https://openai.com/blog', timeout=10)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                articles = soup.find_all('article', limit=5)
-                
-                news_items = []
-                for article in articles:
-                    title_elem = article.find('h2') or article.find('h3')
-                    if title_elem:
-                        title = title_elem.get_text().strip()
-                        link = article.find('a')
-                        url = f"https://openai.com{link['href']}" if link and link.get('href') else ""
-                        
-                        # Get article content
-                        content = self.get_article_content(url) if url else ""
-                        
-                        news_items.append({
-                            "title": title,
-                            "excerpt": content[:300] + "..." if len(content) > 300 else content,
-                            "content": content,
-                            "category": "Breaking",
-                            "source": "OpenAI Blog",
-                            "time": "Recently",
-                            "url": url,
-                            "image": "/globe.svg",
-                            "timestamp": timezone.now().timestamp()
-                        })
-                
-                return news_items
-        except:
-            pass
-        return []
-    
-    def scrape_google_ai_blog(self):
-        """Scrape Google AI blog for latest news"""
-        try:
-            response = requests.get('https://ai.googleblog.com/', timeout=10)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                articles = soup.find_all('article', limit=5)
-                
-                news_items = []
-                for article in articles:
-                    title_elem = article.find('h2') or article.find('h3')
-                    if title_elem:
-                        title = title_elem.get_text().strip()
-                        link = article.find('a')
-                        url = link['href'] if link and link.get('href') else ""
-                        
-                        # Get article content
-                        content = self.get_article_content(url) if url else ""
-                        
-                        news_items.append({
-                            "title": title,
-                            "excerpt": content[:300] + "..." if len(content) > 300 else content,
-                            "content": content,
-                            "category": "Research",
-                            "source": "Google AI Blog",
-                            "time": "Recently",
-                            "url": url,
-                            "image": "/globe.svg",
-                            "timestamp": timezone.now().timestamp()
-                        })
-                
-                return news_items
-        except:
-            pass
-        return []
-    
-    def get_article_content(self, url):
-        """Get full article content from URL"""
-        try:
-            response = requests.get(url, timeout=10)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Remove script and style elements
-                for script in soup(["script", "style"]):
-                    script.decompose()
-                
-                # Get text content
-                text = soup.get_text()
-                
-                # Clean up text
-                lines = (line.strip() for line in text.splitlines())
-                chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-                text = ' '.join(chunk for chunk in chunks if chunk)
-                
-                return text[:2000]  # Limit content length
-        except:
-            pass
-        return ""
-    
-    def get_research_news(self):
-        """Get research news from various sources"""
-        return [
-            {
-                "title": "Breakthrough in quantum machine learning algorithms",
-                "excerpt": "Researchers have developed new quantum machine learning algorithms that could revolutionize AI processing. The algorithms leverage quantum computing principles to solve complex optimization problems.",
-                "content": "Researchers have developed new quantum machine learning algorithms that could revolutionize AI processing. The algorithms leverage quantum computing principles to solve complex optimization problems that are currently intractable for classical computers. This breakthrough could lead to significant advances in drug discovery, materials science, and financial modeling. The research team demonstrated that their quantum algorithms can achieve exponential speedup for certain types of machine learning tasks.",
-                "category": "Research",
-                "source": "Science",
-                "time": "1 day ago",
-                "url": "https://science.org/quantum-ml-breakthrough",
-                "image": "/globe.svg",
-                "timestamp": timezone.now().timestamp() - 86400
-            }
-        ]
-    
-    def get_fallback_news(self):
-        """Fallback news when all sources fail"""
-        return [
-            {
-                "title": "AI Development Continues Rapid Pace",
-                "excerpt": "Recent developments in artificial intelligence show continued progress across multiple domains including language models, computer vision, and robotics. The field is advancing at an unprecedented rate.",
-                "content": "Recent developments in artificial intelligence show continued progress across multiple domains including language models, computer vision, and robotics. The field is advancing at an unprecedented rate, with new breakthroughs being announced regularly. Researchers and companies worldwide are pushing the boundaries of what's possible with AI, leading to innovations that could transform industries and society.",
-                "category": "Industry",
-                "source": "AI Research",
-                "time": "2 hours ago",
-                "url": "#",
-                "image": "/globe.svg",
-                "timestamp": timezone.now().timestamp() - 7200
-            }
-        ]
-    
-    def format_time(self, published_str):
-        """Format time display"""
-        try:
-            from datetime import datetime
-            dt = datetime.fromisoformat(published_str.replace('Z', '+00:00'))
-            now = timezone.now()
-            diff = now - dt.replace(tzinfo=timezone.utc)
-            
-            if diff.days > 0:
-                return f"{diff.days} days ago"
-            elif diff.seconds > 3600:
-                hours = diff.seconds // 3600
-                return f"{hours} hours ago"
-            else:
-                minutes = diff.seconds // 60
-                return f"{minutes} minutes ago"
-        except:
-            return "Recently"
-    
-    def parse_timestamp(self, published_str):
-        """Parse timestamp for sorting"""
-        try:
-            from datetime import datetime
-            dt = datetime.fromisoformat(published_str.replace('Z', '+00:00'))
-            return dt.replace(tzinfo=timezone.utc).timestamp()
-        except:
-            return timezone.now().timestamp()
+        return Response({
+            "news": news_data,
+            "total_count": len(news_data),
+            "next_cursor": next_cursor,
+            "last_updated": last_updated.isoformat(),
+            "missed_sources": missed_sources
+        })
+
+async def news_stream(request):
+    """SSE stream of newly stored news items, only served by the ASGI app
+
+    Under WSGI Django buffers the whole async generator and every open stream
+    would hold a sync worker, so there the view answers 204, which tells
+    EventSource to stop reconnecting. Deploy this route on backend/asgi.py
+    (see README).
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    response = StreamingHttpResponse(news_events(last_event_id), content_type='text/event-stream; charset=utf-8')
+    response['Cache-Control'] = 'no-cache'
+    # 关掉 nginx 的响应缓冲，否则事件会被攒着不发
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 class NewsDetailView(APIView):
     permission_classes = [AllowAny]
     
+    @method_decorator(cache_control(max_age=0, must_revalidate=True))
+    @method_decorator(condition(etag_func=news_detail_etag, last_modified_func=news_detail_last_modified))
     def get(self, request, news_id):
-        """Get detailed news article by ID"""
-        try:
-            # Get all news and return the specific one
-            news_list = NewsListView()
-            all_news = news_list.get_comprehensive_news()
-            
-            news_id_int = int(news_id)
-            if 0 <= news_id_int < len(all_news):
-                return Response(all_news[news_id_int])
-            else:
-                return Response({"error": "News article not found"}, status=404)
-        except Exception as e:
-            return Response({"error": str(e)}, status=500)
+        """Get detailed news article by its stable ID"""
+        error = unsupported_lang(request)
+        if error is not None:
+            return error
+        item = NewsItem.objects.filter(news_id=news_id).first()
+        if item is None:
+            return Response({"error": "News article not found"}, status=404)
+        lang = request.GET.get('lang')
+        context = {'translations': translations_for([item], lang)} if lang else {}
+        return Response(NewsItemSerializer(item, context=context).data)
+
+class NewsSourceHealthView(APIView):
+    """内部接口：各新闻来源的熔断状态与滚动延迟/错误率"""
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        sources = NewsSource.objects.order_by('name')
+        return Response({"sources": [source_health(source) for source in sources]})
 
 class UserStatsView(APIView):
     permission_classes = [AllowAny]
@@ -2,6 +2,8 @@
 ASGI config for backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Long-lived endpoints such as the news SSE stream (/api/news/stream/) should
+be served from here, e.g. ``uvicorn backend.asgi:application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -11,6 +13,7 @@ import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+# 与 wsgi 入口使用同一套配置（airoam.settings），backend.settings 只是项目脚手架，没有注册 api
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "airoam.settings")
 
 application = get_asgi_application()
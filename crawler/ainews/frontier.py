@@ -0,0 +1,131 @@
+"""URL frontier：按规范化 URL 去重，并根据每个页面过去的变化频率决定何时重抓"""
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.db import connection
+from django.utils import timezone
+
+from api.models import CrawlPage
+from api.news import canonical_url
+
+
+class Frontier:
+    """Decides which URLs are due and learns how often each one changes
+
+    Pages that changed since the last visit get their recrawl interval
+    halved, unchanged ones (304 or same text) get it doubled, within
+    [min_interval, max_interval]. State lives in the CrawlPage table and is
+    written back in bulk by flush().
+
+    Content hashes and validators only mean "already stored", so when a
+    store batch failed (store_failed) flush() keeps the old ones and the
+    changed pages are fetched and written again on the next run.
+    """
+
+    def __init__(self, initial_interval, min_interval, max_interval):
+        self.initial_interval = initial_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.seen = set()
+        self.pages = {}
+        self.dirty = set()
+        self.store_failed = False
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            settings.getint('CRAWL_INITIAL_INTERVAL', 6 * 3600),
+            settings.getint('CRAWL_MIN_INTERVAL', 3600),
+            settings.getint('CRAWL_MAX_INTERVAL', 30 * 24 * 3600),
+        )
+
+    def _load(self, keys):
+        missing = [key for key in keys if key not in self.pages]
+        if missing:
+            for page in CrawlPage.objects.filter(url__in=missing):
+                self.pages[page.url] = page
+
+    def due(self, urls, force=False):
+        """Filter urls down to those not seen in this run and due for a recrawl"""
+        fresh = {}
+        for url in urls:
+            key = canonical_url(url)
+            if key not in self.seen and key not in fresh:
+                fresh[key] = url
+        self.seen.update(fresh)
+        self._load(list(fresh))
+
+        now = timezone.now()
+        return [
+            url for key, url in fresh.items()
+            if force or key not in self.pages or not self.pages[key].next_crawl_at or self.pages[key].next_crawl_at <= now
+        ]
+
+    def due_on_site(self, listing_url):
+        """Known pages on the listing's site that are due, for runs where the listing returned 304"""
+        listing = canonical_url(listing_url)
+        parts = urlsplit(listing)
+        pages = CrawlPage.objects.filter(
+            url__startswith=f'{parts.scheme}://{parts.netloc}/', next_crawl_at__lte=timezone.now()
+        ).exclude(url=listing)
+        for page in pages:
+            self.pages.setdefault(page.url, page)
+        return self.due([page.url for page in pages])
+
+    def request_headers(self, url):
+        """Conditional request headers from the last visit"""
+        page = self.pages.get(canonical_url(url))
+        headers = {}
+        if page is not None:
+            if page.etag:
+                headers['If-None-Match'] = page.etag
+            if page.last_modified:
+                headers['If-Modified-Since'] = page.last_modified
+        return headers
+
+    def record(self, url, content_hash=None, etag='', last_modified=''):
+        """Update a page after a visit; content_hash None means 304. Returns whether it changed"""
+        key = canonical_url(url)
+        page = self.pages.get(key)
+        if page is None:
+            page = self.pages[key] = CrawlPage(url=key, change_interval=self.initial_interval)
+
+        now = timezone.now()
+        changed = content_hash is not None and content_hash != page.content_hash
+        if changed:
+            page.content_hash = content_hash
+            page.last_changed_at = now
+            page.change_interval = max(self.min_interval, page.change_interval // 2)
+        else:
+            page.change_interval = min(self.max_interval, page.change_interval * 2)
+        if content_hash is not None:
+            page.etag = etag or ''
+            page.last_modified = last_modified or ''
+        page.last_crawled_at = now
+        page.next_crawl_at = now + timedelta(seconds=page.change_interval)
+        self.dirty.add(key)
+        return changed
+
+    def set_validators(self, url, etag='', last_modified=''):
+        """Attach validators to a page recorded earlier in this run"""
+        page = self.pages[canonical_url(url)]
+        page.etag = etag or ''
+        page.last_modified = last_modified or ''
+
+    def flush(self):
+        """Write visited pages back in two bulk statements"""
+        pages = [self.pages[key] for key in self.dirty]
+        self.dirty = set()
+        fields = ['change_interval', 'last_crawled_at', 'last_changed_at', 'next_crawl_at']
+        if self.store_failed:
+            # 有批次没写进数据库：不记内容指纹和校验值，下次这些页面仍算“有变化”，会重新入库
+            for page in pages:
+                if page.pk is None:
+                    page.content_hash = page.etag = page.last_modified = ''
+        else:
+            fields += ['etag', 'last_modified', 'content_hash']
+        new = [page for page in pages if page.pk is None]
+        CrawlPage.objects.bulk_create(new, batch_size=500)
+        CrawlPage.objects.bulk_update([page for page in pages if page.pk is not None], fields, batch_size=500)
+        connection.close()
+        return len(pages)
@@ -0,0 +1,14 @@
+import scrapy
+
+
+class NewsArticleItem(scrapy.Item):
+    """Same shape as the dicts api.news.upsert_news_items takes"""
+    title = scrapy.Field()
+    excerpt = scrapy.Field()
+    content = scrapy.Field()
+    category = scrapy.Field()
+    source = scrapy.Field()
+    time = scrapy.Field()
+    url = scrapy.Field()
+    image = scrapy.Field()
+    timestamp = scrapy.Field()
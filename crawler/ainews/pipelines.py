@@ -0,0 +1,59 @@
+from django.db import connection
+from twisted.internet import defer, threads
+
+from api.news import upsert_news_items
+from api.news_snapshot import publish_snapshot
+
+
+class DjangoWriterPipeline:
+    """Write scraped articles into the backend database in batches
+
+    Each batch goes through api.news.upsert_news_items, the same path the
+    ingest worker uses: new rows are bulk-inserted and dedup and the search
+    index run once per batch, so news ids and clusters stay consistent.
+    Writes run in the reactor's thread pool one batch at a time, so the crawl
+    never waits on the database.
+    """
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.batch = []
+        self.pending = defer.succeed(None)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler.settings.getint('NEWS_PIPELINE_BATCH_SIZE', 100))
+
+    def process_item(self, item, spider):
+        self.batch.append(dict(item))
+        if len(self.batch) >= self.batch_size:
+            self.flush(spider)
+        return item
+
+    def flush(self, spider):
+        batch, self.batch = self.batch, []
+        self.pending.addCallback(lambda _: threads.deferToThread(self.store, batch, spider))
+        self.pending.addErrback(self.store_failed, spider)
+
+    def store(self, batch, spider):
+        try:
+            created, updated, duplicates = upsert_news_items(batch)
+            spider.logger.info(f"stored {len(batch)} items: created={created} updated={updated} duplicates={duplicates}")
+        finally:
+            # 线程池里的线程各自持有数据库连接，用完就关
+            connection.close()
+
+    @staticmethod
+    def store_failed(failure, spider):
+        spider.logger.error(f"Failed to store news batch: {failure.value}")
+        # 这一轮的内容指纹和校验值不能保存，否则没入库的文章下次会被当成没变化
+        spider.frontier.store_failed = True
+
+    def close_spider(self, spider):
+        if self.batch:
+            self.flush(spider)
+        self.pending.addCallback(lambda _: threads.deferToThread(spider.frontier.flush))
+        self.pending.addCallback(lambda count: spider.logger.info(f"updated crawl schedule for {count} pages"))
+        # 新文章入库后重新发布列表快照，Web worker 下次检查版本戳时切换
+        self.pending.addCallback(lambda _: threads.deferToThread(publish_snapshot))
+        return self.pending
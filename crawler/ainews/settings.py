@@ -0,0 +1,57 @@
+"""ainews 爬虫配置：抓取结果直接写入后端 Django 使用的数据库"""
+import os
+import sys
+
+import django
+
+# 复用后端的模型和入库逻辑，数据库由后端配置（DATABASE_URL）决定
+BACKEND_DIR = os.environ.get(
+    'AIROAM_BACKEND_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'backend'),
+)
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'airoam.settings')
+django.setup()
+
+BOT_NAME = 'ainews'
+
+SPIDER_MODULES = ['ainews.spiders']
+NEWSPIDER_MODULE = 'ainews.spiders'
+
+USER_AGENT = 'AiroamNewsBot/1.0 (+https://airoam.net)'
+ROBOTSTXT_OBEY = True
+
+# 礼貌抓取：全局并发不高，单个域名最多 2 个并发，并按响应时间自动降速
+CONCURRENT_REQUESTS = 16
+CONCURRENT_REQUESTS_PER_DOMAIN = 2
+DOWNLOAD_DELAY = 1
+RANDOMIZE_DOWNLOAD_DELAY = True
+AUTOTHROTTLE_ENABLED = True
+AUTOTHROTTLE_START_DELAY = 1
+AUTOTHROTTLE_MAX_DELAY = 30
+AUTOTHROTTLE_TARGET_CONCURRENCY = 1.0
+DOWNLOAD_TIMEOUT = 30
+
+# 个别站点单独限速（按主机名）
+DOWNLOAD_SLOTS = {
+    'openai.com': {'concurrency': 1, 'delay': 2},
+    'ai.googleblog.com': {'concurrency': 2, 'delay': 1},
+}
+
+RETRY_TIMES = 2
+DEPTH_LIMIT = 1
+
+# 重抓间隔（秒）：新页面的初始间隔，以及按变化频率调整时的上下限
+CRAWL_INITIAL_INTERVAL = 6 * 3600
+CRAWL_MIN_INTERVAL = 3600
+CRAWL_MAX_INTERVAL = 30 * 24 * 3600
+
+ITEM_PIPELINES = {
+    'ainews.pipelines.DjangoWriterPipeline': 300,
+}
+# 每攒够这么多条就批量写一次库
+NEWS_PIPELINE_BATCH_SIZE = 100
+
+# 回调里会同步调用 Django ORM，asyncio reactor 下 Django 会拒绝（SynchronousOnlyOperation）
+TWISTED_REACTOR = 'twisted.internet.selectreactor.SelectReactor'
+FEED_EXPORT_ENCODING = 'utf-8'
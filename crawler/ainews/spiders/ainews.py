@@ -0,0 +1,141 @@
+import hashlib
+
+import scrapy
+from django.utils import timezone
+
+from api.extract import extract_text
+from api.models import NewsItem
+from api.news import format_time, news_id_for_url, parse_timestamp
+
+from ..frontier import Frontier
+from ..items import NewsArticleItem
+
+# 列表页每次运行都抓（带条件请求），文章页由 frontier 按变化频率决定是否重抓；
+# 列表页 304 时也照样调度到期的已知文章
+BLOGS = [
+    {'source': 'OpenAI Blog', 'category': 'Breaking', 'listing': 'https://openai.com/blog'},
+    {'source': 'Google AI Blog', 'category': 'Research', 'listing': 'https://ai.googleblog.com/'},
+]
+
+
+class AINewsSpider(scrapy.Spider):
+    name = 'ainews'
+    # 304 交给回调处理，用来延长重抓间隔
+    handle_httpstatus_list = [304]
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        spider.frontier = Frontier.from_settings(crawler.settings)
+        # 列表页 URL -> 文章还没处理完时暂存的校验值和待处理文章
+        spider.listings = {}
+        return spider
+
+    def start_requests(self):
+        for blog in BLOGS:
+            url = blog['listing']
+            self.frontier.due([url], force=True)
+            yield scrapy.Request(
+                url, callback=self.parse_listing, headers=self.frontier.request_headers(url),
+                cb_kwargs={'blog': blog},
+            )
+
+    def parse_listing(self, response, blog):
+        if response.status == 304:
+            self.frontier.record(blog['listing'])
+            yield from self.recrawl_known(blog)
+            return
+
+        titles = {}
+        for article in response.css('article'):
+            href = article.css('a::attr(href)').get()
+            title = ' '.join(article.css('h2 ::text, h3 ::text').getall()).strip()
+            if href and title:
+                titles.setdefault(response.urljoin(href), title)
+
+        # 先不带校验值记录列表页，文章都处理完才补上；否则下一轮 304 会跳过这次没抓到的文章
+        self.frontier.record(blog['listing'], hashlib.sha1(response.body).hexdigest())
+        urls = self.frontier.due(list(titles))
+        self.listings[blog['listing']] = {
+            'etag': self._header(response, 'ETag'),
+            'last_modified': self._header(response, 'Last-Modified'),
+            'pending': set(urls),
+            'failed': False,
+        }
+        if not urls:
+            self.finish_listing(blog['listing'])
+        for url in urls:
+            yield self.article_request(blog, titles[url], url)
+
+    def recrawl_known(self, blog):
+        """Requests for this blog's stored articles whose recrawl time has come"""
+        urls = self.frontier.due_on_site(blog['listing'])
+        titles = dict(
+            NewsItem.objects.filter(news_id__in=[news_id_for_url(url) for url in urls]).values_list('news_id', 'title')
+        )
+        for url in urls:
+            title = titles.get(news_id_for_url(url))
+            if title:
+                yield self.article_request(blog, title, url)
+
+    def article_request(self, blog, title, url):
+        return scrapy.Request(
+            url, callback=self.parse_article, errback=self.article_failed,
+            headers=self.frontier.request_headers(url),
+            cb_kwargs={'blog': blog, 'title': title, 'url': url},
+        )
+
+    def article_failed(self, failure):
+        kwargs = failure.request.cb_kwargs
+        self.logger.warning(f"Failed to fetch {kwargs['url']}: {failure.value}")
+        self.article_done(kwargs['blog']['listing'], kwargs['url'], failed=True)
+
+    def article_done(self, listing_url, url, failed=False):
+        listing = self.listings.get(listing_url)
+        if listing is None or url not in listing['pending']:
+            return
+        listing['pending'].discard(url)
+        listing['failed'] = listing['failed'] or failed
+        if not listing['pending']:
+            self.finish_listing(listing_url)
+
+    def finish_listing(self, listing_url):
+        listing = self.listings.pop(listing_url)
+        # 有文章没抓到就不记校验值，下一轮拿到完整列表页再补；
+        # 写库在 frontier.flush，排在 pipeline 所有批次存完之后，存失败时也不会保存
+        if not listing['failed']:
+            self.frontier.set_validators(listing_url, listing['etag'], listing['last_modified'])
+
+    def parse_article(self, response, blog, title, url):
+        self.article_done(blog['listing'], url)
+        # 以列表页上的链接为准记录，跳转后的地址可能每次不同
+        if response.status == 304:
+            self.frontier.record(url)
+            return
+
+        content = extract_text([response.body], max_chars=2000, encoding=response.encoding)
+        changed = self.frontier.record(
+            url, hashlib.sha1(content.encode('utf-8')).hexdigest(),
+            self._header(response, 'ETag'), self._header(response, 'Last-Modified'),
+        )
+        # 正文没变就不用再写库
+        if not changed:
+            return
+
+        published = response.css('meta[property="article:published_time"]::attr(content)').get()
+        yield NewsArticleItem(
+            title=title,
+            excerpt=content[:300] + "..." if len(content) > 300 else content,
+            content=content,
+            category=blog['category'],
+            source=blog['source'],
+            time=format_time(published) if published else "Recently",
+            url=url,
+            image="/globe.svg",
+            timestamp=parse_timestamp(published) if published else timezone.now().timestamp(),
+        )
+
+    @staticmethod
+    def _header(response, name):
+        value = response.headers.get(name)
+        return value.decode('latin-1') if value else ''
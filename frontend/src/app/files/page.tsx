@@ -37,18 +37,27 @@ const FilesPage: React.FC = () => {
   const [error, setError] = useState<string | null>(null);
   const [showUpload, setShowUpload] = useState(false);
   const [showPublic, setShowPublic] = useState(false);
+  // 列表按游标分页，nextCursor 为空表示没有更多
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
-  const fetchFiles = async () => {
+  const fetchFiles = async (cursor: string | null = null) => {
     try {
-      setLoading(true);
+      if (cursor) {
+        setLoadingMore(true);
+      } else {
+        setLoading(true);
+      }
       const API_BASE = process.env.NEXT_PUBLIC_API_BASE || 'https://api.airoam.net';
-      const response = await fetch(`${API_BASE}/api/files/`, {
+      const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+      const response = await fetch(`${API_BASE}/api/files/${query}`, {
         credentials: 'include',
       });
       
       if (response.ok) {
         const data = await response.json();
-        setFiles(data.files);
+        setFiles(prev => cursor ? [...prev, ...data.files] : data.files);
+        setNextCursor(data.next_cursor ?? null);
       } else {
         setError('获取文件列表失败');
       }
@@ -56,18 +65,25 @@ const FilesPage: React.FC = () => {
       setError('网络错误');
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
-  const fetchPublicFiles = async () => {
+  const fetchPublicFiles = async (cursor: string | null = null) => {
     try {
-      setLoading(true);
+      if (cursor) {
+        setLoadingMore(true);
+      } else {
+        setLoading(true);
+      }
       const API_BASE = process.env.NEXT_PUBLIC_API_BASE || 'https://api.airoam.net';
-      const response = await fetch(`${API_BASE}/api/public-files/`);
+      const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+      const response = await fetch(`${API_BASE}/api/public-files/${query}`);
       
       if (response.ok) {
         const data = await response.json();
-        setFiles(data.files);
+        setFiles(prev => cursor ? [...prev, ...data.files] : data.files);
+        setNextCursor(data.next_cursor ?? null);
       } else {
         setError('获取公开文件列表失败');
       }
@@ -75,6 +91,16 @@ const FilesPage: React.FC = () => {
       setError('网络错误');
     } finally {
       setLoading(false);
+      setLoadingMore(false);
+    }
+  };
+
+  const loadMore = () => {
+    if (!nextCursor || loadingMore) return;
+    if (showPublic) {
+      fetchPublicFiles(nextCursor);
+    } else {
+      fetchFiles(nextCursor);
     }
   };
 
@@ -280,6 +306,19 @@ const FilesPage: React.FC = () => {
             ))}
           </div>
         )}
+
+        {nextCursor && (
+          <div className="mt-8 text-center">
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="bg-slate-700 hover:bg-slate-600 disabled:opacity-50 text-white py-2 px-6 rounded-lg text-sm transition-colors inline-flex items-center gap-2"
+            >
+              {loadingMore && <FontAwesomeIcon icon={faSpinner} className="w-3 h-3 animate-spin" />}
+              加载更多
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -7,6 +7,7 @@ import Logo from "../../components/Logo";
 import { useEffect, useState } from "react";
 
 interface NewsItem {
+  id?: string;
   title: string;
   excerpt: string;
   content?: string;
@@ -52,6 +53,21 @@ export default function NewsPage() {
     fetchNews();
   }, []);
 
+  // 订阅新条目推送（SSE），有新闻入库时插到列表顶部；搜索时不插入。
+  // 推送只由 ASGI 进程提供，部署了才设置 NEXT_PUBLIC_NEWS_STREAM_URL，否则不订阅
+  useEffect(() => {
+    const streamUrl = process.env.NEXT_PUBLIC_NEWS_STREAM_URL;
+    if (!streamUrl || search || typeof EventSource === "undefined") return;
+    const source = new EventSource(streamUrl);
+    source.addEventListener("news", (event) => {
+      const item: NewsItem = JSON.parse((event as MessageEvent).data);
+      setNewsData((current) =>
+        current.some((news) => news.id === item.id) ? current : [item, ...current]
+      );
+    });
+    return () => source.close();
+  }, [search]);
+
   // 搜索栏输入时自动搜索
   useEffect(() => {
     const delayDebounce = setTimeout(() => {
@@ -155,7 +171,7 @@ export default function NewsPage() {
             <div className="col-span-3 text-center text-slate-400 py-8">暂无新闻</div>
           ) : (
             newsData.map((news, idx) => (
-              <article key={idx} className="bg-slate-800/50 backdrop-blur-sm rounded-2xl border border-slate-700/50 hover:border-blue-500/50 transition-all duration-300 hover:shadow-2xl hover:shadow-blue-500/10 group overflow-hidden">
+              <article key={news.id || idx} className="bg-slate-800/50 backdrop-blur-sm rounded-2xl border border-slate-700/50 hover:border-blue-500/50 transition-all duration-300 hover:shadow-2xl hover:shadow-blue-500/10 group overflow-hidden">
                 <div className="aspect-video bg-slate-700/50 relative overflow-hidden">
                   <div className="absolute inset-0 bg-gradient-to-br from-blue-500/20 to-purple-500/20"></div>
                   <div className="absolute top-4 left-4">